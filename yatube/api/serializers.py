@@ -0,0 +1,49 @@
+"""Представление постов и комментариев в JSON."""
+
+
+POST_FIELDS = (
+    'id', 'text', 'pub_date', 'author', 'group', 'image', 'comments_count',
+)
+COMMENT_FIELDS = ('id', 'post', 'text', 'pub_date', 'author')
+
+
+class FieldsError(ValueError):
+    pass
+
+
+def parse_fields(request, allowed):
+    """Поля из ?fields=a,b; без параметра - все поля."""
+    raw = request.GET.get('fields')
+    if not raw:
+        return allowed
+    fields = tuple(dict.fromkeys(
+        field.strip() for field in raw.split(',') if field.strip()
+    ))
+    unknown = set(fields) - set(allowed)
+    if unknown:
+        raise FieldsError(f'Неизвестные поля: {", ".join(sorted(unknown))}')
+    return fields
+
+
+def post_data(post, fields=POST_FIELDS):
+    values = {
+        'id': lambda: post.pk,
+        'text': lambda: post.text,
+        'pub_date': lambda: post.pub_date.isoformat(),
+        'author': lambda: post.author.username,
+        'group': lambda: post.group.slug if post.group_id else None,
+        'image': lambda: post.image.url if post.image else None,
+        'comments_count': lambda: post.comments_count,
+    }
+    return {field: values[field]() for field in fields}
+
+
+def comment_data(comment, fields=COMMENT_FIELDS):
+    values = {
+        'id': lambda: comment.pk,
+        'post': lambda: comment.post_id,
+        'text': lambda: comment.text,
+        'pub_date': lambda: comment.pub_date.isoformat(),
+        'author': lambda: comment.author.username,
+    }
+    return {field: values[field]() for field in fields}
@@ -0,0 +1,151 @@
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.queries import QueryBudgetMixin
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class ApiTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Avtoritto')
+        cls.reader = User.objects.create_user(username='Chitatel')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='group',
+            description='Описание',
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.author, text=f'Пост {i}', group=cls.group)
+            for i in range(settings.PAGINATOR_COUNT_POSTS + 2)
+        )
+        cls.post = Post.objects.latest('pub_date', 'pk')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(ApiTests.reader)
+
+    def test_feeds_cursor_and_fields(self):
+        """Ленты листаются курсором и отдают выбранные поля."""
+        urls = (
+            reverse('api:index'),
+            reverse('api:group_posts', kwargs={'slug': 'group'}),
+            reverse('api:profile', kwargs={'username': 'Avtoritto'}),
+        )
+        expected = list(
+            Post.objects.order_by('-pub_date', '-pk').values_list(
+                'pk', flat=True
+            )
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                first = self.guest_client.get(url, {'fields': 'id'}).json()
+                self.assertEqual(
+                    first['results'],
+                    [{'id': pk} for pk in expected[:len(first['results'])]]
+                )
+                second = self.guest_client.get(
+                    url, {'fields': 'id,text', 'cursor': first['next']}
+                ).json()
+                self.assertEqual(
+                    [post['id'] for post in second['results']],
+                    expected[settings.PAGINATOR_COUNT_POSTS:]
+                )
+                self.assertEqual(set(second['results'][0]), {'id', 'text'})
+                self.assertIsNone(second['next'])
+
+    def test_errors_are_json(self):
+        """Ошибки отдаются в JSON с нужным статусом."""
+        cases = (
+            (reverse('api:index'), {'fields': 'password'}, 400),
+            (reverse('api:post_detail', kwargs={'post_id': 0}), {}, 404),
+            (reverse('api:follow_index'), {}, 401),
+            (reverse('api:follow', kwargs={'username': 'Avtoritto'}), {}, 405),
+        )
+        for url, params, status in cases:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url, params)
+                self.assertEqual(response.status_code, status)
+                self.assertIn('detail', response.json())
+
+    def test_etag_not_modified(self):
+        """Неизменившиеся данные отдаются ответом 304 без запросов."""
+        url = reverse('api:post_detail', kwargs={'post_id': ApiTests.post.pk})
+        response = self.guest_client.get(url)
+        tag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=tag)
+        self.assertEqual(response.status_code, 304)
+        Comment.objects.create(
+            post=ApiTests.post, author=ApiTests.reader, text='Ого'
+        )
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=tag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], tag)
+        self.assertEqual(response.json()['comments_count'], 1)
+
+    def test_add_comment(self):
+        """Комментарий создаёт только вошедший пользователь."""
+        url = reverse('api:comments', kwargs={'post_id': ApiTests.post.pk})
+        body = json.dumps({'text': 'Комментарий'})
+        response = self.guest_client.post(
+            url, body, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 401)
+        response = self.authorized_client.post(
+            url, body, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['author'], 'Chitatel')
+        response = self.authorized_client.post(
+            url, json.dumps({'text': ''}), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        comments = self.guest_client.get(url).json()['results']
+        self.assertEqual([c['text'] for c in comments], ['Комментарий'])
+
+    def test_follow_and_feed(self):
+        """Подписка через API наполняет ленту подписок."""
+        url = reverse('api:follow', kwargs={'username': 'Avtoritto'})
+        self.assertEqual(self.authorized_client.post(url).status_code, 201)
+        self.assertEqual(self.authorized_client.post(url).status_code, 200)
+        self.assertTrue(
+            Follow.objects.filter(
+                user=ApiTests.reader, author=ApiTests.author
+            ).exists()
+        )
+        feed = self.authorized_client.get(reverse('api:follow_index'))
+        self.assertEqual(
+            feed.json()['results'][0]['id'], ApiTests.post.pk
+        )
+        self.assertEqual(self.authorized_client.delete(url).status_code, 204)
+        feed = self.authorized_client.get(reverse('api:follow_index'))
+        self.assertEqual(feed.json()['results'], [])
+
+    def test_query_budget(self):
+        """Эндпоинты укладываются в бюджет запросов без N+1."""
+        Follow.objects.create(user=ApiTests.reader, author=ApiTests.author)
+        urls = (
+            reverse('api:index'),
+            reverse('api:group_posts', kwargs={'slug': 'group'}),
+            reverse('api:profile', kwargs={'username': 'Avtoritto'}),
+            reverse('api:post_detail', kwargs={'post_id': ApiTests.post.pk}),
+            reverse('api:comments', kwargs={'post_id': ApiTests.post.pk}),
+            reverse('api:follow_index'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertQueryBudget(self.authorized_client, url)
+        url = reverse('api:follow', kwargs={'username': 'Avtoritto'})
+        for method in ('delete', 'post'):
+            with self.subTest(method=method):
+                self.assertQueryBudget(
+                    self.authorized_client, url, method=method
+                )
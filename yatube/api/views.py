@@ -0,0 +1,232 @@
+"""JSON API v1 для мобильных клиентов.
+
+Авторизация - сессией сайта; изменяющие запросы проверяют CSRF, токен
+передаётся в заголовке X-CSRFToken. Списки листаются курсором
+(?cursor=), набор полей выбирается параметром ?fields=id,text.
+
+Ответы на GET несут сильный ETag. Для лент, постов и комментариев
+он строится из версий кеша (см. posts.caching) без обращения к БД,
+поэтому неизменившаяся страница отдаётся ответом 304 бесплатно.
+"""
+import hashlib
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.http import (
+    Http404, HttpResponse, HttpResponseNotModified, JsonResponse
+)
+from django.shortcuts import get_object_or_404
+from django.utils.http import parse_etags
+
+from core.queries import query_budget
+from core.routers import read_only
+from posts import caching, timeline
+from posts.forms import CommentForm
+from posts.models import Comment, Follow, Group, Post, User
+from posts.utils import KeysetPaginator
+
+from .serializers import (
+    COMMENT_FIELDS, POST_FIELDS, FieldsError, comment_data, parse_fields,
+    post_data
+)
+
+
+API_VERSION = 1
+
+
+def error(status, detail, **extra):
+    return JsonResponse({'detail': detail, **extra}, status=status)
+
+
+def api_view(*methods, login=False):
+    """Проверяет метод и вход, ошибки отдаёт в JSON."""
+    if 'GET' in methods:
+        methods += ('HEAD',)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                response = error(405, 'Метод не поддерживается.')
+                response['Allow'] = ', '.join(methods)
+                return response
+            if login and not request.user.is_authenticated:
+                return error(401, 'Нужно войти.')
+            try:
+                return view(request, *args, **kwargs)
+            except Http404:
+                return error(404, 'Не найдено.')
+            except FieldsError as exc:
+                return error(400, str(exc))
+        return wrapper
+    return decorator
+
+
+def etag(*parts):
+    return '"{}"'.format(hashlib.md5(repr(parts).encode()).hexdigest())
+
+
+def conditional(request, tag, build):
+    """304 при совпадении If-None-Match, иначе JSON из build()."""
+    if_none_match = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    if tag in if_none_match or '*' in if_none_match:
+        response = HttpResponseNotModified()
+    else:
+        response = JsonResponse(build())
+    response['ETag'] = tag
+    return response
+
+
+def page_data(page, serialize, fields):
+    return {
+        'results': [serialize(obj, fields) for obj in page],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    }
+
+
+def posts_page(request, posts, fields, key=('pub_date', 'pk')):
+    paginator = KeysetPaginator(posts, settings.PAGINATOR_COUNT_POSTS, key)
+    return page_data(
+        paginator.page(request.GET.get('cursor')), post_data, fields
+    )
+
+
+def versioned(request, scope, fields, build):
+    """Ответ с ETag из версий ленты scope и параметров запроса."""
+    tag = etag(
+        API_VERSION,
+        caching.versions(caching.ALL_FEEDS, scope),
+        request.GET.get('cursor'),
+        fields,
+    )
+    return conditional(request, tag, build)
+
+
+@read_only
+@query_budget(2)
+@api_view('GET')
+def index(request):
+    fields = parse_fields(request, POST_FIELDS)
+    posts = Post.objects.select_related('author', 'group')
+    return versioned(
+        request, 'index', fields,
+        lambda: posts_page(request, posts, fields)
+    )
+
+
+@read_only
+@query_budget(3)
+@api_view('GET')
+def group_posts(request, slug):
+    fields = parse_fields(request, POST_FIELDS)
+
+    def build():
+        group = get_object_or_404(Group, slug=slug)
+        posts = group.posts.select_related('author', 'group')
+        return posts_page(request, posts, fields)
+    return versioned(request, f'group:{slug}', fields, build)
+
+
+@read_only
+@query_budget(3)
+@api_view('GET')
+def profile(request, username):
+    fields = parse_fields(request, POST_FIELDS)
+
+    def build():
+        author = get_object_or_404(User, username=username)
+        posts = author.posts.select_related('author', 'group')
+        return posts_page(request, posts, fields)
+    return versioned(request, f'author:{username}', fields, build)
+
+
+@read_only
+@query_budget(1)
+@api_view('GET')
+def post_detail(request, post_id):
+    fields = parse_fields(request, POST_FIELDS)
+
+    def build():
+        post = get_object_or_404(
+            Post.objects.select_related('author', 'group'), pk=post_id
+        )
+        return post_data(post, fields)
+    return versioned(request, f'post:{post_id}', fields, build)
+
+
+@read_only
+@query_budget(9)
+@api_view('GET', 'POST')
+def comments(request, post_id):
+    if request.method == 'POST':
+        return add_comment(request, post_id)
+    fields = parse_fields(request, COMMENT_FIELDS)
+
+    def build():
+        if not Post.objects.filter(pk=post_id).exists():
+            raise Http404
+        paginator = KeysetPaginator(
+            Comment.objects.filter(post_id=post_id).select_related('author'),
+            settings.PAGINATOR_COUNT_POSTS,
+        )
+        page = paginator.page(request.GET.get('cursor'))
+        return page_data(page, comment_data, fields)
+    return versioned(request, f'post:{post_id}', fields, build)
+
+
+def request_data(request):
+    if request.content_type == 'application/json':
+        try:
+            return json.loads(request.body)
+        except ValueError:
+            return None
+    return request.POST
+
+
+def add_comment(request, post_id):
+    if not request.user.is_authenticated:
+        return error(401, 'Нужно войти.')
+    data = request_data(request)
+    if not isinstance(data, dict):
+        return error(400, 'Ожидается JSON-объект.')
+    post = get_object_or_404(Post, pk=post_id)
+    form = CommentForm(data)
+    if not form.is_valid():
+        return error(400, 'Ошибка в данных.', errors=form.errors)
+    comment = form.save(commit=False)
+    comment.author = request.user
+    comment.post = post
+    comment.save()
+    return JsonResponse(comment_data(comment), status=201)
+
+
+@read_only
+@query_budget(6)
+@api_view('GET', login=True)
+def follow_index(request):
+    fields = parse_fields(request, POST_FIELDS)
+    # У ленты подписок нет своей версии: ETag считается по странице.
+    data = posts_page(
+        request, timeline.feed(request.user), fields, timeline.FEED_KEY
+    )
+    return conditional(request, etag(API_VERSION, data), lambda: data)
+
+
+@query_budget(14)
+@api_view('POST', 'DELETE', login=True)
+def follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if request.method == 'DELETE':
+        Follow.objects.filter(user=request.user, author=author).delete()
+        return HttpResponse(status=204)
+    if author == request.user:
+        return error(400, 'Нельзя подписаться на себя.')
+    _, created = Follow.objects.get_or_create(
+        user=request.user, author=author
+    )
+    return JsonResponse(
+        {'author': author.username, 'following': True},
+        status=201 if created else 200
+    )
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+
+SQLITE = 'django.db.backends.sqlite3'
+SQLITE_SEARCH = 'search.backends.SqliteFTSBackend'
+LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register()
+def shared_cache(app_configs, **kwargs):
+    """Кеш должен быть общим, если запросы и задачи идут в разных процессах.
+
+    В кеше лежат версии лент, множества подписок и сами страницы. С
+    локальным кешем сброс версии в воркере или задаче core.tasks не
+    виден остальным процессам, и они отдают устаревшие страницы.
+    """
+    if settings.DEBUG or not settings.TASKS_WORKERS:
+        return []
+    if settings.CACHES['default']['BACKEND'] not in LOCAL_CACHES:
+        return []
+    return [Warning(
+        'Кеш по умолчанию локален для процесса, а задачи выполняются '
+        'в отдельных процессах.',
+        hint='Настройте memcached или файловый кеш, '
+             'см. yatube/settings_production.py.',
+        id='core.W001',
+    )]
+
+
+@register()
+def search_backend(app_configs, **kwargs):
+    """Индекс FTS5 есть только в SQLite.
+
+    Миграция search создаёт таблицу search_fts лишь на SQLite, на
+    другой базе каждое сохранение поста или комментария упало бы.
+    """
+    if settings.SEARCH_BACKEND != SQLITE_SEARCH:
+        return []
+    if settings.DATABASES['default']['ENGINE'] == SQLITE:
+        return []
+    return [Error(
+        'SqliteFTSBackend работает только с SQLite.',
+        hint="Задайте SEARCH_BACKEND = "
+             "'search.backends.InvertedIndexBackend'.",
+        id='core.E001',
+    )]
@@ -0,0 +1,207 @@
+"""Публикация и чтение событий для живого обновления страниц.
+
+Событие - словарь, опубликованный в канал (например 'feed',
+'group:<slug>' или 'post:<id>'). Подписчик читает события после
+известного ему id, поэтому после переподключения SSE-клиент по
+Last-Event-ID получает пропущенное.
+
+Брокер выбирается настройкой EVENTS_BROKER. InProcessBroker хранит
+события в памяти процесса и годится для runserver и тестов.
+FileBroker пишет события в файлы каталога EVENTS_DIR и работает между
+процессами одной машины. Оба - замена настоящему брокеру (Redis
+pub/sub) с тем же интерфейсом.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class BaseBroker:
+    def publish(self, channel, event):
+        raise NotImplementedError
+
+    def position(self, channel):
+        """id последнего события канала."""
+        raise NotImplementedError
+
+    def listen(self, channel, after, timeout):
+        """События после id after; ждёт до timeout секунд.
+
+        Возвращает список пар (id, событие) и id, с которого читать
+        дальше.
+        """
+        raise NotImplementedError
+
+
+class InProcessBroker(BaseBroker):
+    """Кольцевые буферы событий в памяти процесса."""
+
+    def __init__(self, buffer_size=1000):
+        self.condition = threading.Condition()
+        self.channels = {}
+        self.last_ids = {}
+        self.buffer_size = buffer_size
+
+    def publish(self, channel, event):
+        with self.condition:
+            event_id = self.last_ids.get(channel, 0) + 1
+            self.last_ids[channel] = event_id
+            self.channels.setdefault(
+                channel, deque(maxlen=self.buffer_size)
+            ).append((str(event_id), event))
+            self.condition.notify_all()
+
+    def position(self, channel):
+        with self.condition:
+            return str(self.last_ids.get(channel, 0))
+
+    def _after(self, channel, after):
+        after = int(after) if str(after).isdecimal() else 0
+        return [
+            (event_id, event)
+            for event_id, event in self.channels.get(channel, ())
+            if int(event_id) > after
+        ]
+
+    def listen(self, channel, after, timeout):
+        with self.condition:
+            self.condition.wait_for(
+                lambda: self._after(channel, after), timeout
+            )
+            events = self._after(channel, after)
+        return events, events[-1][0] if events else after
+
+
+class FileBroker(BaseBroker):
+    """Канал - файл JSON-строк, id события - inode и смещение.
+
+    Запись одной строки с O_APPEND атомарна, поэтому публиковать
+    могут несколько процессов. Файл больше EVENTS_FILE_MAX_BYTES
+    заменяется новым; читатель замечает смену inode и читает новый
+    файл с начала.
+    """
+
+    def __init__(self, directory=None, max_bytes=None, poll_interval=0.5):
+        self.directory = directory or settings.EVENTS_DIR
+        self.max_bytes = max_bytes or settings.EVENTS_FILE_MAX_BYTES
+        self.poll_interval = poll_interval
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, channel):
+        return os.path.join(self.directory, channel.replace(':', '--'))
+
+    def publish(self, channel, event):
+        path = self._path(channel)
+        line = json.dumps(event, ensure_ascii=False) + '\n'
+        try:
+            if os.path.getsize(path) > self.max_bytes:
+                os.replace(path, path + '.old')
+        except FileNotFoundError:
+            pass
+        descriptor = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        try:
+            os.write(descriptor, line.encode())
+        finally:
+            os.close(descriptor)
+
+    def _stat(self, channel):
+        try:
+            stat = os.stat(self._path(channel))
+        except FileNotFoundError:
+            return 0, 0
+        return stat.st_ino, stat.st_size
+
+    def position(self, channel):
+        inode, size = self._stat(channel)
+        return f'{inode}:{size}'
+
+    def _read(self, channel, after):
+        inode, size = self._stat(channel)
+        try:
+            after_inode, offset = map(int, str(after).split(':'))
+        except ValueError:
+            after_inode, offset = inode, size
+        if after_inode != inode or offset > size:
+            offset = 0
+        if offset == size:
+            return [], f'{inode}:{offset}'
+        events = []
+        with open(self._path(channel), 'rb') as stream:
+            stream.seek(offset)
+            for line in stream:
+                if not line.endswith(b'\n'):
+                    # Строка ещё дописывается: дочитаем её в следующий раз.
+                    break
+                offset += len(line)
+                events.append((f'{inode}:{offset}', json.loads(line)))
+        return events, f'{inode}:{offset}'
+
+    def listen(self, channel, after, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            events, after = self._read(channel, after)
+            if events or time.monotonic() >= deadline:
+                return events, after
+            time.sleep(self.poll_interval)
+
+
+@lru_cache(maxsize=None)
+def broker():
+    return import_string(settings.EVENTS_BROKER)()
+
+
+def publish(channel, event):
+    broker().publish(channel, event)
+
+
+_streams_lock = threading.Lock()
+_open_streams = 0
+
+
+def _messages(events):
+    for event_id, event in events:
+        data = json.dumps(event, ensure_ascii=False)
+        yield f'id: {event_id}\nevent: {event["type"]}\ndata: {data}\n\n'
+
+
+def stream(channel, after):
+    """Поток text/event-stream для канала начиная после id after.
+
+    Открытый поток занимает поток воркера, поэтому в процессе их не
+    больше EVENTS_MAX_STREAMS. Сверх этого клиент получает накопившиеся
+    события и retry EVENTS_POLL_MS: EventSource переподключается с
+    Last-Event-ID и так опрашивает канал. Поток закрывается через
+    EVENTS_STREAM_SECONDS, чтобы не держать воркер вечно.
+    """
+    global _open_streams
+    # Счётчик меняется внутри генератора: finally ниже выполнится,
+    # только если генератор уже запущен.
+    with _streams_lock:
+        live = _open_streams < settings.EVENTS_MAX_STREAMS
+        if live:
+            _open_streams += 1
+    if not live:
+        events, after = broker().listen(channel, after, 0)
+        # id без данных запоминается клиентом как Last-Event-ID.
+        yield f'retry: {settings.EVENTS_POLL_MS}\nid: {after}\n\n'
+        yield from _messages(events)
+        return
+    try:
+        yield f'retry: {settings.EVENTS_RETRY_MS}\nid: {after}\n\n'
+        deadline = time.monotonic() + settings.EVENTS_STREAM_SECONDS
+        while time.monotonic() < deadline:
+            events, after = broker().listen(
+                channel, after, settings.EVENTS_HEARTBEAT
+            )
+            if not events:
+                yield ': ping\n\n'
+            yield from _messages(events)
+    finally:
+        with _streams_lock:
+            _open_streams -= 1
@@ -0,0 +1,111 @@
+"""Очередь исходящих писем.
+
+QueuedEmailBackend только сохраняет письма в таблицу QueuedEmail,
+поэтому отправка формы сброса пароля не ждёт почтовый сервер.
+Доставляет письма команда send_queued_mail: она берёт письма пачками,
+отправляет их через одно соединение EMAIL_QUEUE_BACKEND и при ошибке
+откладывает письмо с растущей паузой.
+
+Взятые в работу письма получают аренду на EMAIL_QUEUE_LEASE секунд:
+если воркер упадёт, письмо снова станет доступным после неё, а
+параллельный воркер его не возьмёт.
+"""
+import logging
+import pickle
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Почтовый бэкенд, который ставит письма в очередь."""
+
+    def send_messages(self, email_messages):
+        now = timezone.now()
+        queued = []
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            # Соединение не сериализуется и при доставке будет своё.
+            message.connection = None
+            queued.append(
+                QueuedEmail(message=pickle.dumps(message), next_attempt=now)
+            )
+        QueuedEmail.objects.bulk_create(queued)
+        return len(queued)
+
+
+def claim(batch_size):
+    """Берёт в работу пачку писем, которым пора уйти."""
+    now = timezone.now()
+    with transaction.atomic():
+        due = QueuedEmail.objects.select_for_update(skip_locked=True).filter(
+            sent__isnull=True,
+            next_attempt__lte=now,
+            attempts__lt=settings.EMAIL_QUEUE_MAX_ATTEMPTS,
+        ).order_by('next_attempt', 'pk')
+        emails = list(due[:batch_size])
+        QueuedEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(
+            next_attempt=now + timedelta(seconds=settings.EMAIL_QUEUE_LEASE)
+        )
+    return emails
+
+
+def retry_delay(attempts):
+    return timedelta(
+        seconds=settings.EMAIL_QUEUE_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def postpone(email, exc):
+    """Засчитывает неудачную попытку и откладывает письмо."""
+    email.attempts += 1
+    email.last_error = repr(exc)
+    email.next_attempt = timezone.now() + retry_delay(email.attempts)
+    email.save(update_fields=['attempts', 'last_error', 'next_attempt'])
+
+
+def deliver(batch_size=None):
+    """Отправляет одну пачку, возвращает (отправлено, отложено)."""
+    emails = claim(batch_size or settings.EMAIL_QUEUE_BATCH_SIZE)
+    if not emails:
+        return 0, 0
+    sent = failed = 0
+    connection = get_connection(settings.EMAIL_QUEUE_BACKEND)
+    try:
+        connection.open()
+    except Exception as exc:
+        # Сервер недоступен: откладывается вся пачка, аренда снимается.
+        for email in emails:
+            postpone(email, exc)
+        logger.warning('Почтовый сервер недоступен: %r', exc)
+        return 0, len(emails)
+    try:
+        for email in emails:
+            try:
+                message = pickle.loads(email.message)
+                message.connection = connection
+                connection.send_messages([message])
+            except Exception as exc:
+                postpone(email, exc)
+                logger.warning('Письмо %s не отправлено: %r', email.pk, exc)
+                failed += 1
+            else:
+                QueuedEmail.objects.filter(pk=email.pk).update(
+                    sent=timezone.now()
+                )
+                sent += 1
+    finally:
+        connection.close()
+    return sent, failed
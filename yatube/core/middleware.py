@@ -0,0 +1,43 @@
+import logging
+
+from django.conf import settings
+
+from .queries import QueryRecorder
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCountMiddleware:
+    """Считает SQL-запросы каждого запроса и предупреждает о N+1.
+
+    Бюджет берётся из атрибута query_budget view (см. query_budget).
+    При DEBUG количество и суммарное время запросов отдаются в
+    заголовках X-Query-Count и X-Query-Duration.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with recorder.record():
+            response = self.get_response(request)
+        budget = getattr(request, 'query_budget', None)
+        if budget is not None and recorder.count > budget:
+            logger.warning(
+                '%s: %d SQL-запросов при бюджете %d',
+                request.path, recorder.count, budget
+            )
+        for sql, times in recorder.repeated().items():
+            logger.warning(
+                '%s: возможный N+1, запрос выполнен %d раз: %s',
+                request.path, times, sql
+            )
+        if settings.DEBUG:
+            response['X-Query-Count'] = recorder.count
+            response['X-Query-Duration'] = f'{recorder.duration:.4f}'
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = getattr(view_func, 'query_budget', None)
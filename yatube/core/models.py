@@ -11,3 +11,23 @@ class CreatedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class QueuedEmail(models.Model):
+    """Письмо в очереди на отправку (см. core.mail)."""
+    message = models.BinaryField('Письмо')
+    created = models.DateTimeField('Дата постановки', auto_now_add=True)
+    next_attempt = models.DateTimeField('Следующая попытка')
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    sent = models.DateTimeField('Дата отправки', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Письма в очереди'
+        indexes = [
+            models.Index(
+                fields=['sent', 'next_attempt'],
+                name='queued_email_due'
+            ),
+        ]
@@ -0,0 +1,92 @@
+"""Учёт SQL-запросов: количество, длительность и повторы (N+1).
+
+Запросы одинаковой формы - это один и тот же SQL с разными
+параметрами. Если такой запрос выполняется за запрос к странице
+много раз, это почти всегда N+1: связанные объекты догружаются по
+одному в цикле вместо select_related/prefetch_related.
+"""
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.urls import resolve
+
+
+PLACEHOLDERS = re.compile(r'%s(?:, %s)+')
+
+
+def query_budget(queries):
+    """Объявляет, сколько SQL-запросов может сделать view."""
+    def decorator(view):
+        view.query_budget = queries
+        return view
+    return decorator
+
+
+def shape(sql):
+    """SQL без учёта длины списков в IN (...)."""
+    return PLACEHOLDERS.sub('%s, ...', sql)
+
+
+class QueryRecorder:
+    """Записывает SQL и длительность каждого запроса ко всем БД."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.monotonic() - start))
+
+    @contextmanager
+    def record(self):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration(self):
+        return sum(duration for _, duration in self.queries)
+
+    def repeated(self, threshold=None):
+        """Формы запросов, выполненные не меньше threshold раз."""
+        if threshold is None:
+            threshold = settings.QUERY_REPEAT_THRESHOLD
+        shapes = Counter(shape(sql) for sql, _ in self.queries)
+        return {sql: times for sql, times in shapes.items()
+                if times >= threshold}
+
+
+class QueryBudgetMixin:
+    """Проверки бюджета запросов для тестов на TestCase."""
+
+    def assertQueryBudget(self, client, url, data=None, method='get'):
+        """Запрос укладывается в бюджет view.
+
+        Предупреждения QueryCountMiddleware о превышении бюджета и N+1
+        тоже проваливают проверку.
+        """
+        view = resolve(url).func
+        budget = getattr(view, 'query_budget', None)
+        self.assertIsNotNone(budget, f'У {view.__name__} нет query_budget')
+        recorder = QueryRecorder()
+        with self.assertNoLogs('core.middleware', 'WARNING'):
+            with recorder.record():
+                getattr(client, method)(url, data)
+        self.assertLessEqual(
+            recorder.count,
+            budget,
+            f'{url}: запросов {recorder.count} при бюджете {budget}'
+        )
+        self.assertEqual(recorder.repeated(), {}, f'{url}: похоже на N+1')
@@ -0,0 +1,96 @@
+"""Чтение с реплик БД, запись в основную базу.
+
+Реплики перечислены в DATABASE_REPLICAS. На реплику уходят только
+чтения view, помеченных read_only, и только пока пользователь не
+писал сам: после записи ReplicaMiddleware ставит cookie, и в течение
+REPLICA_STICKY_SECONDS его запросы читают из основной базы, чтобы
+он сразу видел свой пост или комментарий несмотря на отставание
+реплики. Вне HTTP-запросов (команды, фоновые задачи) всё читается из
+основной базы.
+"""
+import random
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+STICKY_COOKIE = 'use_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+# Сессию, созданную при входе, реплика может ещё не получить.
+PRIMARY_APPS = {'sessions'}
+
+_state = threading.local()
+
+
+def read_only(view):
+    """Помечает view, которому достаточно данных с реплики."""
+    view.read_only = True
+    return view
+
+
+def use_replica(allowed):
+    """Разрешает или запрещает чтение с реплик в текущем потоке."""
+    _state.replica = allowed
+    _state.wrote = False
+
+
+def wrote():
+    """Была ли запись в основную базу с последнего use_replica."""
+    return getattr(_state, 'wrote', False)
+
+
+def _track_writes(execute, sql, params, many, context):
+    if sql.lstrip().upper().startswith(WRITE_STATEMENTS):
+        # После записи запрос дочитывает данные из основной базы.
+        _state.replica = False
+        _state.wrote = True
+    return execute(sql, params, many, context)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if (replicas and getattr(_state, 'replica', False)
+                and model._meta.app_label not in PRIMARY_APPS):
+            return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики - копии основной базы, объекты из них совместимы.
+        return True
+
+
+class ReplicaMiddleware:
+    """Включает реплики для read_only view и держит липкость записи."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        use_replica(False)
+        primary = connections[DEFAULT_DB_ALIAS]
+        try:
+            with primary.execute_wrapper(_track_writes):
+                response = self.get_response(request)
+            if wrote():
+                response.set_cookie(
+                    STICKY_COOKIE,
+                    '1',
+                    max_age=settings.REPLICA_STICKY_SECONDS,
+                    httponly=True,
+                )
+            return response
+        finally:
+            use_replica(False)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        use_replica(
+            getattr(view_func, 'read_only', False)
+            and request.method in SAFE_METHODS
+            and STICKY_COOKIE not in request.COOKIES
+        )
@@ -0,0 +1,52 @@
+"""Локальная очередь фоновых задач на пуле процессов.
+
+Задача ставится в очередь после коммита транзакции, чтобы воркер
+видел сохранённые данные. Воркеры запускаются через spawn и сами
+настраивают Django, поэтому не делят соединения с БД с родителем.
+При TASKS_WORKERS = 0 задача выполняется в текущем процессе.
+"""
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.db import transaction
+
+
+logger = logging.getLogger(__name__)
+
+_shared_pool = None
+
+
+def _setup_worker():
+    django.setup()
+
+
+def pool(workers):
+    """Новый пул процессов с настроенным Django."""
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_setup_worker,
+    )
+
+
+def _log_failure(future):
+    if future.exception() is not None:
+        logger.error('Фоновая задача упала', exc_info=future.exception())
+
+
+def _enqueue(func, args):
+    global _shared_pool
+    if _shared_pool is None:
+        _shared_pool = pool(settings.TASKS_WORKERS)
+    _shared_pool.submit(func, *args).add_done_callback(_log_failure)
+
+
+def submit(func, *args):
+    """Выполняет func(*args) в фоне после коммита текущей транзакции."""
+    if not settings.TASKS_WORKERS:
+        transaction.on_commit(lambda: func(*args))
+        return
+    transaction.on_commit(lambda: _enqueue(func, args))
@@ -0,0 +1,69 @@
+import asyncio
+
+from django.test import SimpleTestCase
+
+from core.asgi import WsgiToAsgi
+
+
+def echo(environ, start_response):
+    start_response('201 Created', [('Content-Type', 'text/plain')])
+    body = environ['wsgi.input'].read()
+    return [
+        environ['REQUEST_METHOD'].encode(),
+        environ['PATH_INFO'].encode('latin-1'),
+        environ['QUERY_STRING'].encode(),
+        environ['HTTP_X_TEST'].encode(),
+        body,
+    ]
+
+
+def endless(environ, start_response):
+    start_response('200 OK', [])
+    while True:
+        yield b'ping'
+
+
+class WsgiToAsgiTests(SimpleTestCase):
+    def call(self, wsgi, messages, **scope):
+        sent = []
+        application = WsgiToAsgi(wsgi, threads=2)
+        messages = list(messages)
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await asyncio.sleep(0.05)
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(application({
+            'type': 'http',
+            'method': 'POST',
+            'path': '/путь/',
+            'query_string': b'a=1',
+            'headers': [(b'x-test', b'1'), (b'x-test', b'2')],
+            **scope,
+        }, receive, send))
+        application.executor.shutdown()
+        return sent
+
+    def test_request_and_response(self):
+        """Запрос доходит до WSGI-приложения, ответ - до клиента."""
+        sent = self.call(echo, [
+            {'type': 'http.request', 'body': b'te', 'more_body': True},
+            {'type': 'http.request', 'body': b'xt'},
+        ])
+        self.assertEqual(sent[0]['status'], 201)
+        self.assertIn((b'content-type', b'text/plain'), sent[0]['headers'])
+        body = b''.join(message.get('body', b'') for message in sent[1:])
+        self.assertEqual(body, 'POST/путь/a=11,2text'.encode())
+        self.assertFalse(sent[-1].get('more_body'))
+
+    def test_disconnect_stops_stream(self):
+        """Бесконечный поток прекращается, когда клиент отключился."""
+        sent = self.call(endless, [{'type': 'http.request'}])
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertEqual(sent[1]['body'], b'ping')
+        self.assertEqual(sent[-1], {'type': 'http.response.body', 'body': b''})
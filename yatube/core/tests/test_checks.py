@@ -0,0 +1,51 @@
+from django.test import SimpleTestCase, override_settings
+
+from core.checks import search_backend, shared_cache
+
+LOCMEM = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+}
+FILES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': '/tmp/yatube-cache',
+    }
+}
+
+
+@override_settings(DEBUG=False, TASKS_WORKERS=2)
+class SharedCacheCheckTests(SimpleTestCase):
+    @override_settings(CACHES=LOCMEM)
+    def test_local_cache_with_task_processes(self):
+        """Локальный кеш при задачах в других процессах - предупреждение."""
+        self.assertEqual(
+            [warning.id for warning in shared_cache(None)], ['core.W001']
+        )
+
+    @override_settings(CACHES=FILES)
+    def test_shared_cache(self):
+        """Общий кеш проверку проходит."""
+        self.assertEqual(shared_cache(None), [])
+
+    @override_settings(CACHES=LOCMEM, TASKS_WORKERS=0)
+    def test_tasks_in_process(self):
+        """Без отдельных процессов локальный кеш допустим."""
+        self.assertEqual(shared_cache(None), [])
+
+
+class SearchBackendCheckTests(SimpleTestCase):
+    @override_settings(SEARCH_BACKEND='search.backends.SqliteFTSBackend')
+    def test_fts_on_other_database(self):
+        """FTS5 на базе кроме SQLite - ошибка."""
+        databases = {'default': {
+            'ENGINE': 'django.db.backends.postgresql', 'NAME': 'yatube'
+        }}
+        with override_settings(DATABASES=databases):
+            self.assertEqual(
+                [error.id for error in search_backend(None)], ['core.E001']
+            )
+
+    @override_settings(SEARCH_BACKEND='search.backends.SqliteFTSBackend')
+    def test_fts_on_sqlite(self):
+        """FTS5 на SQLite проверку проходит."""
+        self.assertEqual(search_backend(None), [])
@@ -0,0 +1,156 @@
+import tempfile
+from unittest import mock
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import events
+from posts.models import Comment, Group, Post, User
+
+
+def run_on_commit(callback):
+    callback()
+
+
+class BrokerTests(TestCase):
+    def check_broker(self, broker):
+        start = broker.position('feed')
+        broker.publish('feed', {'type': 'post', 'id': 1})
+        broker.publish('group:cats', {'type': 'post', 'id': 2})
+        broker.publish('feed', {'type': 'post', 'id': 3})
+        received, position = broker.listen('feed', start, 0)
+        self.assertEqual(
+            [event['id'] for _, event in received], [1, 3]
+        )
+        self.assertEqual(position, received[-1][0])
+        self.assertEqual(position, broker.position('feed'))
+        after_first, _ = broker.listen('feed', received[0][0], 0)
+        self.assertEqual([event['id'] for _, event in after_first], [3])
+        self.assertEqual(broker.listen('feed', position, 0), ([], position))
+
+    def test_in_process_broker(self):
+        """InProcessBroker отдаёт события канала после известного id."""
+        self.check_broker(events.InProcessBroker())
+
+    def test_file_broker(self):
+        """FileBroker отдаёт события канала после известного id."""
+        with tempfile.TemporaryDirectory() as directory:
+            self.check_broker(events.FileBroker(directory))
+
+    def test_file_broker_rotation(self):
+        """После замены файла читатель начинает новый файл с начала."""
+        with tempfile.TemporaryDirectory() as directory:
+            broker = events.FileBroker(directory, max_bytes=10)
+            broker.publish('feed', {'type': 'post', 'id': 1})
+            position = broker.position('feed')
+            broker.publish('feed', {'type': 'post', 'id': 2})
+            received, _ = broker.listen('feed', position, 0)
+            self.assertEqual([event['id'] for _, event in received], [2])
+
+
+@override_settings(
+    EVENTS_BROKER='core.events.InProcessBroker',
+    EVENTS_HEARTBEAT=0,
+    EVENTS_STREAM_SECONDS=0.01,
+    EVENTS_MAX_STREAMS=8,
+    EVENTS_POLL_MS=30000,
+)
+class LiveEventsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Avtoritto')
+        cls.group = Group.objects.create(
+            title='Кошки', slug='cats', description='Про кошек'
+        )
+
+    def setUp(self):
+        events.broker.cache_clear()
+        self.addCleanup(events.broker.cache_clear)
+        patcher = mock.patch(
+            'posts.signals.transaction.on_commit', run_on_commit
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def read(self, channel, last_event_id='0'):
+        response = Client().get(
+            reverse('posts:events'),
+            {'channel': channel},
+            HTTP_LAST_EVENT_ID=last_event_id,
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        return b''.join(response.streaming_content).decode()
+
+    def test_new_post_is_published(self):
+        """Новый пост приходит в общую ленту и ленту группы."""
+        post = Post.objects.create(
+            author=self.user, text='Мяу', group=self.group
+        )
+        for channel in ('feed', 'group:cats'):
+            with self.subTest(channel=channel):
+                body = self.read(channel)
+                self.assertIn('event: post\n', body)
+                self.assertIn(f'"id": {post.pk}', body)
+
+    def test_new_comment_is_published(self):
+        """Новый комментарий приходит в канал поста."""
+        post = Post.objects.create(author=self.user, text='Мяу')
+        comment = Comment.objects.create(
+            post=post, author=self.user, text='Мур'
+        )
+        body = self.read(f'post:{post.pk}')
+        self.assertIn('event: comment\n', body)
+        self.assertIn(f'"id": {comment.pk}', body)
+        self.assertNotIn('event: post\n', body)
+
+    def test_stream_starts_at_current_position(self):
+        """Без Last-Event-ID поток не повторяет старые события."""
+        Post.objects.create(author=self.user, text='Мяу')
+        body = self.read('feed', last_event_id='')
+        self.assertNotIn('event: post', body)
+        self.assertIn(': ping', body)
+
+    def test_bad_last_event_id(self):
+        """Неразборчивый Last-Event-ID читается с начала буфера."""
+        Post.objects.create(author=self.user, text='Мяу')
+        self.assertIn('event: post\n', self.read('feed', last_event_id='²'))
+
+    @override_settings(PAGINATOR_KEYSET=True)
+    def test_live_banner_on_first_keyset_page(self):
+        """Плашка новых постов есть на первой странице ленты с курсором."""
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+        ):
+            with self.subTest(url=url):
+                self.assertContains(Client().get(url), 'id="live-posts"')
+
+    def test_streams_are_capped(self):
+        """Сверх EVENTS_MAX_STREAMS клиент опрашивает канал."""
+        start = events.broker().position('feed')
+        Post.objects.create(author=self.user, text='Мяу')
+        with override_settings(EVENTS_MAX_STREAMS=0):
+            body = self.read('feed', last_event_id=start)
+        self.assertTrue(body.startswith('retry: 30000\n'))
+        self.assertIn('event: post\n', body)
+        self.assertNotIn(': ping', body)
+        self.assertEqual(events._open_streams, 0)
+
+    def test_stream_slot_is_released(self):
+        """Закрытый поток освобождает место для следующего."""
+        with override_settings(EVENTS_MAX_STREAMS=1):
+            stream = events.stream('feed', '0')
+            next(stream)
+            self.assertEqual(events._open_streams, 1)
+            self.assertNotIn(': ping', self.read('feed'))
+            stream.close()
+            self.assertIn(': ping', self.read('feed'))
+        self.assertEqual(events._open_streams, 0)
+
+    def test_bad_channel(self):
+        """Неизвестный канал отклоняется."""
+        response = Client().get(
+            reverse('posts:events'), {'channel': 'secret'}
+        )
+        self.assertEqual(response.status_code, 400)
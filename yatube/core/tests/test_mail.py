@@ -0,0 +1,99 @@
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import QueuedEmail
+from posts.models import User
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError('SMTP недоступен')
+
+
+class UnreachableBackend(BaseEmailBackend):
+    def open(self):
+        raise ConnectionRefusedError('SMTP недоступен')
+
+    def send_messages(self, email_messages):
+        raise AssertionError('Соединение не открыто')
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.QueuedEmailBackend',
+    EMAIL_QUEUE_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class MailQueueTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='Avtoritto',
+            email='avtoritto@example.com',
+            password='parol-parol',
+        )
+
+    def deliver(self):
+        call_command('send_queued_mail', stdout=StringIO())
+
+    def test_password_reset_is_queued(self):
+        """Сброс пароля ставит письмо в очередь, воркер его отправляет."""
+        response = Client().post(
+            reverse('users:password_reset'),
+            {'email': 'avtoritto@example.com'}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(QueuedEmail.objects.count(), 1)
+        self.deliver()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['avtoritto@example.com'])
+        self.assertIsNotNone(QueuedEmail.objects.get().sent)
+        self.deliver()
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(
+        EMAIL_QUEUE_BACKEND='core.tests.test_mail.FailingBackend',
+        EMAIL_QUEUE_MAX_ATTEMPTS=2,
+    )
+    def test_failed_delivery_is_retried(self):
+        """Неудачная отправка откладывается, попытки ограничены."""
+        mail.send_mail('Тема', 'Текст', None, ['reader@example.com'])
+        self.deliver()
+        email = QueuedEmail.objects.get()
+        self.assertEqual(email.attempts, 1)
+        self.assertIn('SMTP недоступен', email.last_error)
+        self.assertGreater(email.next_attempt, timezone.now())
+        self.deliver()
+        self.assertEqual(QueuedEmail.objects.get().attempts, 1)
+        QueuedEmail.objects.update(next_attempt=timezone.now())
+        self.deliver()
+        QueuedEmail.objects.update(next_attempt=timezone.now())
+        self.deliver()
+        email = QueuedEmail.objects.get()
+        self.assertEqual(email.attempts, 2)
+        self.assertIsNone(email.sent)
+
+    @override_settings(
+        EMAIL_QUEUE_BACKEND='core.tests.test_mail.UnreachableBackend'
+    )
+    def test_unreachable_server_postpones_batch(self):
+        """Если сервер недоступен, откладывается вся пачка, воркер жив."""
+        for recipient in ('first@example.com', 'second@example.com'):
+            mail.send_mail('Тема', 'Текст', None, [recipient])
+        with mock.patch(
+            'core.management.commands.send_queued_mail.time.sleep',
+            side_effect=KeyboardInterrupt,
+        ):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command('send_queued_mail', watch=True, stdout=StringIO())
+        for email in QueuedEmail.objects.all():
+            self.assertEqual(email.attempts, 1)
+            self.assertIn('SMTP недоступен', email.last_error)
+            self.assertGreater(email.next_attempt, timezone.now())
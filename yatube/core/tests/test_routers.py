@@ -0,0 +1,70 @@
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from core.routers import (
+    STICKY_COOKIE, ReplicaMiddleware, ReplicaRouter, read_only
+)
+from posts.models import Post, User
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Avtoritto')
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+        self.routes = {}
+
+    def call(self, request, action=None, marked=True):
+        def view(request):
+            if action is not None:
+                action()
+            return self.remember_routes(request)
+
+        if marked:
+            view = read_only(view)
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            return view(request)
+
+        middleware = ReplicaMiddleware(get_response)
+        return middleware(request)
+
+    def remember_routes(self, request):
+        self.routes['post'] = self.router.db_for_read(Post)
+        self.routes['session'] = self.router.db_for_read(Session)
+        return HttpResponse()
+
+    def test_read_only_view_reads_replica(self):
+        """Помеченный view читает с реплики, сессии - из основной базы."""
+        response = self.call(self.factory.get('/'))
+        self.assertEqual(self.routes['post'], 'replica')
+        self.assertEqual(self.routes['session'], 'default')
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_other_views_read_primary(self):
+        """Непомеченный view и POST читают из основной базы."""
+        self.call(self.factory.get('/'), marked=False)
+        self.assertEqual(self.routes['post'], 'default')
+        self.call(self.factory.post('/'))
+        self.assertEqual(self.routes['post'], 'default')
+
+    def test_write_makes_reads_sticky(self):
+        """После записи чтения идут в основную базу и ставится cookie."""
+        response = self.call(
+            self.factory.get('/'),
+            lambda: Post.objects.create(author=self.user, text='Пост')
+        )
+        self.assertEqual(self.routes['post'], 'default')
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        request = self.factory.get('/')
+        request.COOKIES[STICKY_COOKIE] = '1'
+        self.call(request)
+        self.assertEqual(self.routes['post'], 'default')
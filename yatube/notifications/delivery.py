@@ -0,0 +1,87 @@
+"""Раздача уведомлений и счётчик непрочитанных.
+
+Уведомления о новом посте раскладываются подписчикам автора в фоне
+(core.tasks) пачками по NOTIFICATIONS_BATCH_SIZE: на каждую пачку
+один INSERT уведомлений и один UPDATE счётчиков. Число
+непрочитанных хранится в UserCounter.unread_notifications, поэтому
+шапка сайта читает его одной строкой по ключу.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Subquery
+
+from posts.counters import change
+from posts.models import Follow, Post, UserCounter
+
+from .models import Notification
+
+
+def _unread(user_ids, delta):
+    change(
+        UserCounter.objects.filter(user_id__in=user_ids),
+        'unread_notifications',
+        delta
+    )
+
+
+def notify_followers(post_id):
+    """Уведомляет подписчиков автора о посте; выполняется в фоне."""
+    post = Post.objects.filter(pk=post_id).only('pk', 'author_id').first()
+    if post is None:
+        return
+    followers = Follow.objects.filter(author_id=post.author_id).order_by(
+        'user_id'
+    ).values_list('user_id', flat=True)
+    batch_size = settings.NOTIFICATIONS_BATCH_SIZE
+    last_user_id = 0
+    while True:
+        batch = list(followers.filter(user_id__gt=last_user_id)[:batch_size])
+        if not batch:
+            return
+        with transaction.atomic():
+            Notification.objects.bulk_create(
+                Notification(
+                    user_id=user_id,
+                    actor_id=post.author_id,
+                    post_id=post.pk,
+                    kind=Notification.NEW_POST,
+                )
+                for user_id in batch
+            )
+            _unread(batch, 1)
+        last_user_id = batch[-1]
+
+
+def notify_follow(follow):
+    """Уведомляет автора о новом подписчике."""
+    Notification.objects.create(
+        user_id=follow.author_id,
+        actor_id=follow.user_id,
+        kind=Notification.NEW_FOLLOWER,
+    )
+    _unread([follow.author_id], 1)
+
+
+def forget_post(post):
+    """Снимает непрочитанные уведомления о посте перед его удалением."""
+    _unread(
+        Subquery(
+            Notification.objects.filter(post=post, read=False).values(
+                'user_id'
+            )
+        ),
+        -1
+    )
+
+
+def unread_count(user):
+    return UserCounter.objects.filter(user=user).values_list(
+        'unread_notifications', flat=True
+    ).first() or 0
+
+
+def mark_read(user):
+    """Отмечает все уведомления прочитанными."""
+    with transaction.atomic():
+        Notification.objects.filter(user=user, read=False).update(read=True)
+        UserCounter.objects.filter(user=user).update(unread_notifications=0)
@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+
+User = get_user_model()
+
+
+class Notification(models.Model):
+    """Уведомление пользователя о новом посте или подписчике."""
+    NEW_POST = 'post'
+    NEW_FOLLOWER = 'follow'
+    KINDS = (
+        (NEW_POST, 'Новый пост'),
+        (NEW_FOLLOWER, 'Новый подписчик'),
+    )
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Получатель'
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор события'
+    )
+    post = models.ForeignKey(
+        'posts.Post',
+        on_delete=models.CASCADE,
+        related_name='+',
+        blank=True,
+        null=True,
+        verbose_name='Пост'
+    )
+    kind = models.CharField('Тип', max_length=16, choices=KINDS)
+    created = models.DateTimeField('Дата', auto_now_add=True)
+    read = models.BooleanField('Прочитано', default=False)
+
+    class Meta:
+        verbose_name = 'Уведомление'
+        verbose_name_plural = 'Уведомления'
+        indexes = [
+            models.Index(
+                fields=['user', 'created'],
+                name='notification_user_created'
+            ),
+        ]
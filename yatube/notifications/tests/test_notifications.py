@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from notifications import delivery
+from notifications.models import Notification
+from posts.models import Follow, Post, User, UserCounter
+
+
+class NotificationsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Avtoritto')
+        cls.readers = [
+            User.objects.create_user(username=f'Chitatel{number}')
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        for reader in NotificationsTests.readers:
+            Follow.objects.create(
+                user=reader, author=NotificationsTests.author
+            )
+        self.client = Client()
+        self.client.force_login(NotificationsTests.readers[0])
+
+    def unread(self, user):
+        return UserCounter.objects.get(user=user).unread_notifications
+
+    def test_follow_notifies_author(self):
+        """Автор получает уведомление о каждом подписчике."""
+        self.assertEqual(self.unread(NotificationsTests.author), 3)
+        self.assertEqual(
+            Notification.objects.filter(
+                user=NotificationsTests.author,
+                kind=Notification.NEW_FOLLOWER
+            ).count(),
+            3
+        )
+
+    @override_settings(NOTIFICATIONS_BATCH_SIZE=2)
+    def test_new_post_fans_out_in_background(self):
+        """Новый пост раскладывается подписчикам фоновой задачей."""
+        with mock.patch('core.tasks.submit') as submit:
+            post = Post.objects.create(
+                author=NotificationsTests.author, text='Пост'
+            )
+        submit.assert_called_once_with(delivery.notify_followers, post.pk)
+        delivery.notify_followers(post.pk)
+        for reader in NotificationsTests.readers:
+            self.assertEqual(self.unread(reader), 1)
+        self.assertEqual(
+            Notification.objects.filter(post=post).count(), 3
+        )
+        post.delete()
+        for reader in NotificationsTests.readers:
+            self.assertEqual(self.unread(reader), 0)
+
+    def test_unread_and_mark_read(self):
+        """Счётчик отдаётся в JSON и сбрасывается страницей уведомлений."""
+        post = Post.objects.create(author=NotificationsTests.author, text='П')
+        delivery.notify_followers(post.pk)
+        response = self.client.get(reverse('notifications:unread'))
+        self.assertEqual(response.json(), {'unread': 1})
+        response = self.client.get(reverse('notifications:index'))
+        self.assertEqual(response.context['unread'], {
+            Notification.objects.get(
+                user=NotificationsTests.readers[0]
+            ).pk
+        })
+        self.assertContains(response, 'новый пост')
+        response = self.client.get(reverse('notifications:unread'))
+        self.assertEqual(response.json(), {'unread': 0})
@@ -0,0 +1,31 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import render
+
+from core.queries import query_budget
+from posts import utils
+
+from . import delivery
+
+
+@query_budget(8)
+@login_required
+def index(request):
+    notifications = request.user.notifications.select_related(
+        'actor', 'post'
+    ).order_by('-created', '-pk')
+    page_obj = utils.paginator(request, notifications, keyset=False)
+    unread = {notification.pk for notification in page_obj
+              if not notification.read}
+    delivery.mark_read(request.user)
+    context = {
+        'page_obj': page_obj,
+        'unread': unread,
+    }
+    return render(request, 'notifications/index.html', context)
+
+
+@query_budget(3)
+@login_required
+def unread(request):
+    return JsonResponse({'unread': delivery.unread_count(request.user)})
@@ -1,9 +1,12 @@
 from django.contrib import admin
 
+from search.admin import IndexedSearchMixin
+
 from .models import Post, Group, Comment, Follow
 
 
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    search_kind = 'post'
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
     list_editable = ('group',)
     search_fields = ('text',)
@@ -15,7 +18,8 @@ class GroupAdmin(admin.ModelAdmin):
     list_display = ('title', 'slug', 'description')
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    search_kind = 'comment'
     list_display = ('post', 'author', 'text')
     list_filter = ('author',)
     search_fields = ('text',)
@@ -0,0 +1,394 @@
+"""Синтетические данные и замер производительности страниц лент.
+
+synthetic_records строит поток записей для transfer.Importer, так что
+сид проходит тем же быстрым путём bulk_create, что и импорт. Число
+подписчиков авторов подчиняется степенному закону: немногие авторы
+собирают большую часть подписок, как в настоящих соцсетях.
+
+run прогоняет страницы через тестовый клиент и для каждой считает
+перцентили времени ответа, число SQL-запросов и пик памяти.
+throughput сравнивает пропускную способность WSGI и ASGI при
+одновременных клиентах. seed_graph и graph_run строят граф подписок
+со степенным распределением и замеряют запросы follow_graph.
+"""
+import asyncio
+import math
+import random
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO
+from itertools import accumulate
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.wsgi import get_wsgi_application
+from django.db import reset_queries
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from faker import Faker
+
+from core.asgi import WsgiToAsgi, wsgi_environ
+from core.queries import QueryRecorder
+
+from . import counters, follow_graph
+from .models import Follow, Group, Post, User
+
+
+VIEWS = ('index', 'group_posts', 'profile', 'post_detail', 'follow_index')
+PERCENTILES = (50, 95, 99)
+USERNAME = 'bench_{}'
+GRAPH_USERNAME = 'graph_{}'
+
+
+def synthetic_records(users, groups, posts, comments, follows, alpha=1.2,
+                      days=365, seed=None):
+    """Записи групп, постов, комментариев и подписок.
+
+    follows - среднее число подписок на пользователя; вероятность
+    подписаться на автора с рангом k пропорциональна 1 / k ** alpha.
+    Тексты берутся из заранее сгенерированного набора фраз: Faker на
+    каждую строку сделал бы сид в разы медленнее.
+    """
+    rng = random.Random(seed)
+    fake = Faker('ru_RU')
+    fake.seed_instance(seed)
+    phrases = [fake.paragraph(nb_sentences=3) for _ in range(500)]
+    words = [fake.word() for _ in range(500)]
+    now = timezone.now()
+
+    def text():
+        return rng.choice(phrases)
+
+    def date():
+        age = timedelta(seconds=rng.uniform(0, days * 24 * 60 * 60))
+        return (now - age).isoformat()
+
+    slugs = [f'bench-{number}' for number in range(groups)]
+    for slug in slugs:
+        yield {
+            'type': 'group',
+            'slug': slug,
+            'title': ' '.join(rng.sample(words, 2)).capitalize(),
+            'description': text(),
+        }
+    # Плодовитость авторов тоже распределена по степенному закону.
+    weights = list(accumulate(
+        1 / rank ** alpha for rank in range(1, users + 1)
+    ))
+    usernames = [USERNAME.format(number) for number in range(users)]
+    # id постов задаются явно, чтобы комментарии ссылались на них до
+    # того, как импорт сохранит пачку постов.
+    first_post = (Post.objects.order_by('-pk').values_list(
+        'pk', flat=True
+    ).first() or 0) + 1
+    for number in range(posts):
+        yield {
+            'type': 'post',
+            'id': first_post + number,
+            'author': rng.choices(usernames, cum_weights=weights)[0],
+            'group': rng.choice(slugs) if slugs and rng.random() < 0.7
+            else None,
+            'text': text(),
+            'pub_date': date(),
+        }
+    for _ in range(comments if posts else 0):
+        yield {
+            'type': 'comment',
+            'post': first_post + rng.randrange(posts),
+            'author': rng.choice(usernames),
+            'text': text(),
+            'pub_date': date(),
+        }
+    for username in usernames:
+        count = min(users - 1, int(rng.expovariate(1 / follows)))
+        authors = rng.choices(usernames, cum_weights=weights, k=count)
+        for author in dict.fromkeys(authors):
+            yield {'type': 'follow', 'user': username, 'author': author}
+
+
+def percentile(values, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def sample_urls(view, count, rng):
+    """URL и пользователь для count запросов к странице."""
+    if view == 'index':
+        return [(reverse('posts:index'), None)] * count
+    if view == 'group_posts':
+        slugs = list(Group.objects.values_list('slug', flat=True)[:100])
+        return [
+            (reverse('posts:group_list', args=[rng.choice(slugs)]), None)
+            for _ in range(count)
+        ]
+    authors = list(
+        User.objects.order_by('-counters__posts_count')[:100]
+    )
+    if view == 'profile':
+        return [
+            (reverse('posts:profile', args=[rng.choice(authors)]), None)
+            for _ in range(count)
+        ]
+    if view == 'post_detail':
+        ids = list(
+            Post.objects.order_by('-comments_count').values_list(
+                'pk', flat=True
+            )[:100]
+        )
+        return [
+            (reverse('posts:post_detail', args=[rng.choice(ids)]), None)
+            for _ in range(count)
+        ]
+    readers = list(
+        User.objects.order_by('-counters__following_count')[:100]
+    )
+    return [
+        (reverse('posts:follow_index'), rng.choice(readers))
+        for _ in range(count)
+    ]
+
+
+def run(views=VIEWS, requests=50, cold=False, seed=None, memory_samples=5):
+    """Замеры по страницам: перцентили мс, запросы, пик памяти в КБ.
+
+    cold - очищать кеш перед каждым запросом, чтобы мерить путь до
+    БД, а не чтение готовой страницы из кеша. tracemalloc замедляет
+    код в разы, поэтому память меряется отдельными memory_samples
+    запросами, а не теми, по которым считается время.
+    """
+    rng = random.Random(seed)
+    results = {}
+    for view in views:
+        timings, queries, peaks = [], [], []
+        clients = {}
+        urls = sample_urls(view, requests, rng)
+        for number, (url, user) in enumerate(urls + urls[:memory_samples]):
+            if user not in clients:
+                clients[user] = Client()
+                if user is not None:
+                    clients[user].force_login(user)
+            if cold:
+                cache.clear()
+            reset_queries()
+            if number >= len(urls):
+                tracemalloc.start()
+                clients[user].get(url)
+                peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+                tracemalloc.stop()
+                continue
+            recorder = QueryRecorder()
+            start = time.perf_counter()
+            with recorder.record():
+                clients[user].get(url)
+            timings.append((time.perf_counter() - start) * 1000)
+            queries.append(recorder.count)
+        results[view] = {
+            **{
+                f'p{percent}_ms': round(percentile(timings, percent), 2)
+                for percent in PERCENTILES
+            },
+            'queries_mean': round(sum(queries) / len(queries), 2),
+            'queries_max': max(queries),
+            'peak_memory_kb': round(max(peaks, default=0), 1),
+        }
+    return results
+
+
+def _scope(url, cookie):
+    path, _, query = url.partition('?')
+    headers = [(b'host', b'testserver')]
+    if cookie:
+        headers.append((b'cookie', cookie.encode()))
+    return {
+        'type': 'http',
+        'method': 'GET',
+        'path': path,
+        'query_string': query.encode(),
+        'headers': headers,
+    }
+
+
+def _call_wsgi(application, scope):
+    result = application(
+        wsgi_environ(scope, BytesIO()), lambda *args: None
+    )
+    try:
+        for _ in result:
+            pass
+    finally:
+        result.close()
+
+
+async def _call_asgi(application, scope, semaphore):
+    messages = [{'type': 'http.request'}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        # Клиент не отключается: ждём, пока ответ не будет отправлен.
+        await asyncio.Event().wait()
+
+    async def send(message):
+        pass
+
+    async with semaphore:
+        await application(scope, receive, send)
+
+
+async def _run_asgi(application, scopes, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    await asyncio.gather(
+        *(_call_asgi(application, scope, semaphore) for scope in scopes)
+    )
+
+
+def throughput(views=VIEWS, requests=200, concurrency=8, seed=None):
+    """Запросов в секунду при concurrency одновременных запросах.
+
+    Один и тот же набор запросов проходит через WSGI-приложение в пуле
+    из concurrency потоков, как у многопоточного WSGI-сервера, и через
+    ASGI-обёртку с тем же числом потоков.
+    """
+    rng = random.Random(seed)
+    wsgi = get_wsgi_application()
+    asgi = WsgiToAsgi(wsgi, threads=concurrency)
+    cookies = {}
+    results = {}
+    for view in views:
+        scopes = []
+        for url, user in sample_urls(view, requests, rng):
+            if user is not None and user not in cookies:
+                client = Client()
+                client.force_login(user)
+                name = settings.SESSION_COOKIE_NAME
+                cookies[user] = f'{name}={client.cookies[name].value}'
+            scopes.append(_scope(url, cookies.get(user)))
+        # Прогрев кеша, чтобы оба прогона шли в равных условиях.
+        for scope in scopes:
+            _call_wsgi(wsgi, scope)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            list(executor.map(lambda scope: _call_wsgi(wsgi, scope), scopes))
+        wsgi_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        asyncio.run(_run_asgi(asgi, scopes, concurrency))
+        asgi_seconds = time.perf_counter() - start
+        results[view] = {
+            'wsgi_rps': round(len(scopes) / wsgi_seconds, 1),
+            'asgi_rps': round(len(scopes) / asgi_seconds, 1),
+        }
+    asgi.executor.shutdown()
+    return results
+
+
+def power_law_edges(users, edges, alpha=1.2, seed=None):
+    """edges различных пар (подписчик, автор) из номеров пользователей.
+
+    Подписчик выбирается равномерно, автор - по степенному закону,
+    так что у первых авторов собираются сотни тысяч подписчиков.
+    """
+    rng = random.Random(seed)
+    weights = list(accumulate(
+        1 / rank ** alpha for rank in range(1, users + 1)
+    ))
+    edges = min(edges, users * (users - 1))
+    seen = set()
+    while len(seen) < edges:
+        batch = min(100000, edges - len(seen))
+        authors = rng.choices(range(users), cum_weights=weights, k=batch)
+        for author in authors:
+            follower = rng.randrange(users)
+            if follower != author:
+                seen.add(follower * users + author)
+    for edge in seen:
+        yield divmod(edge, users)
+
+
+def seed_graph(users, edges, alpha=1.2, seed=None, batch_size=10000):
+    """Создаёт пользователей graph_N и подписки между ними."""
+    password = make_password(None)
+    existing = set(
+        User.objects.filter(username__startswith='graph_')
+        .values_list('username', flat=True)
+    )
+    User.objects.bulk_create(
+        (
+            User(username=GRAPH_USERNAME.format(number), password=password)
+            for number in range(users)
+            if GRAPH_USERNAME.format(number) not in existing
+        )
+    )
+    ids = dict(
+        User.objects.filter(username__startswith='graph_')
+        .values_list('username', 'pk')
+    )
+    ids = [ids[GRAPH_USERNAME.format(number)] for number in range(users)]
+    batch = []
+    for follower, author in power_law_edges(users, edges, alpha, seed):
+        batch.append(Follow(user_id=ids[follower], author_id=ids[author]))
+        if len(batch) >= batch_size:
+            Follow.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    Follow.objects.bulk_create(batch, ignore_conflicts=True)
+    # bulk_create не шлёт сигналов: счётчики подписок пересчитываются.
+    counters.reconcile()
+
+
+def graph_run(requests=200, seed=None):
+    """Перцентили мс и число SQL-запросов операций follow_graph.
+
+    Половина запросов идёт к самым популярным авторам графа, половина -
+    к случайным пользователям. Кеш очищается перед каждым запросом,
+    так что множества подписок читаются из БД.
+    """
+    rng = random.Random(seed)
+    graph = User.objects.filter(username__startswith='graph_')
+    hubs = list(graph.order_by('-counters__followers_count')[:20])
+    ids = list(graph.values_list('pk', flat=True))
+    sample = list(User.objects.filter(
+        pk__in=rng.sample(ids, min(len(ids), 200))
+    ))
+
+    def pick(users=None):
+        user = rng.choice(users or (hubs if rng.random() < 0.5 else sample))
+        # Новый объект: follow_set запоминает множество на пользователе.
+        return User(pk=user.pk, username=user.username)
+
+    def deep_page(user):
+        after = rng.choice(ids)
+        return follow_graph.followers(user, after=after)
+
+    operations = {
+        'followers': lambda: follow_graph.followers(pick()),
+        'followers_deep': lambda: deep_page(pick()),
+        'following': lambda: follow_graph.following(pick()),
+        'mutual': lambda: follow_graph.mutual(pick()),
+        'followed_by': lambda: follow_graph.followed_by_followees(
+            pick(sample), pick(hubs)
+        ),
+    }
+    results = {}
+    for name, operation in operations.items():
+        timings, queries = [], []
+        for _ in range(requests):
+            cache.clear()
+            recorder = QueryRecorder()
+            start = time.perf_counter()
+            with recorder.record():
+                operation()
+            timings.append((time.perf_counter() - start) * 1000)
+            queries.append(recorder.count)
+        results[name] = {
+            **{
+                f'p{percent}_ms': round(percentile(timings, percent), 2)
+                for percent in PERCENTILES
+            },
+            'queries_max': max(queries),
+        }
+    return results
@@ -0,0 +1,172 @@
+"""Поколенческий кеш страниц лент.
+
+У каждой ленты (главная, группа, автор) есть счётчик версии, который
+входит в ключ закешированной страницы. Запись поста, комментария или
+подписки увеличивает версии затронутых лент, и следующий запрос уже
+не находит старую страницу, поэтому TTL можно держать большим.
+Версия 'feeds' общая для всех лент и сбрасывает их разом.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.views.decorators.cache import cache_page
+from django.views.decorators.vary import vary_on_cookie
+
+from . import follow_set, utils
+from .models import Comment, Follow, Post, User
+
+
+VERSION_KEY = 'feed_version:{}'
+COMMENTS_KEY = 'comments:{}:{}:{}'
+COUNT_KEY = 'feed_count:{}:{}:{}'
+COMMENTS_TEMPLATE = 'includes/comment_list.html'
+ALL_FEEDS = 'feeds'
+
+
+def versions(*scopes):
+    """Текущие версии лент; отсутствующие создаются заново."""
+    keys = [VERSION_KEY.format(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    missing = {key: int(time.time() * 1000) for key in keys
+               if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return [found[key] for key in keys]
+
+
+def bump(*scopes):
+    """Сдвигает версии лент после записи."""
+    for scope in scopes:
+        try:
+            cache.incr(VERSION_KEY.format(scope))
+        except ValueError:
+            # Версии нет в кеше: она будет создана с новым значением.
+            pass
+
+
+def post_scopes(post):
+    """Ленты, в которых показывается пост, и версия самого поста."""
+    scopes = ['index', f'author:{post.author.username}', f'post:{post.pk}']
+    if post.group_id is not None:
+        scopes.append(f'group:{post.group.slug}')
+    return scopes
+
+
+def follow_scopes(follow):
+    """Профили, на которых видна подписка."""
+    if Follow.user.is_cached(follow) and Follow.author.is_cached(follow):
+        # Подписку только что создали из уже загруженных пользователей.
+        usernames = [follow.user.username, follow.author.username]
+    else:
+        usernames = User.objects.filter(
+            pk__in=(follow.user_id, follow.author_id)
+        ).values_list('username', flat=True)
+    return [f'author:{username}' for username in usernames]
+
+
+def cache_feed(scope):
+    """Кеширует страницу ленты до смены её версии.
+
+    scope - шаблон имени ленты, подставляются аргументы из URL,
+    например 'group:{slug}'. Страница различается по Cookie: Vary от
+    SessionMiddleware появляется уже после cache_page, поэтому без
+    vary_on_cookie посетители получали бы чужие страницы.
+    """
+    def decorator(view):
+        view = vary_on_cookie(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            name = scope.format(**kwargs)
+            generation, version = versions(ALL_FEEDS, name)
+            cached_view = cache_page(
+                settings.FEED_CACHE_TIMEOUT,
+                key_prefix=f'{name}:{generation}:{version}'
+            )(view)
+            return cached_view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def feed_count(scope, queryset):
+    """Число постов ленты, посчитанное один раз на её версию.
+
+    Страницы ленты кешируются по отдельности, а число нужно каждой:
+    так COUNT(*) выполняется один раз после изменения ленты.
+    """
+    generation, version = versions(ALL_FEEDS, scope)
+    key = COUNT_KEY.format(scope, generation, version)
+    count = cache.get(key)
+    if count is None:
+        count = utils.estimated_count(queryset)
+        cache.set(key, count, settings.FEED_CACHE_TIMEOUT)
+    return count
+
+
+def page_etag(request, *scopes):
+    """ETag HTML-страницы из версий лент и cookie посетителя.
+
+    Страница зависит от пользователя (шапка, кнопки, форма с CSRF),
+    поэтому в ETag входят cookie сессии и CSRF, а не request.user:
+    так проверка не делает ни одного запроса к БД.
+    """
+    parts = [
+        versions(ALL_FEEDS, *scopes),
+        request.COOKIES.get(settings.SESSION_COOKIE_NAME),
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME),
+        request.COOKIES.get(follow_set.STAMP_COOKIE),
+        request.get_full_path(),
+    ]
+    return hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def feed_etag(scope):
+    """etag_func для condition() по шаблону имени ленты."""
+    def etag(request, **kwargs):
+        return page_etag(request, scope.format(**kwargs))
+    return etag
+
+
+def post_etag(request, post_id):
+    """etag_func для страницы поста: версии поста и ленты автора.
+
+    Лента автора входит, потому что страница показывает число его
+    постов. Для несуществующего поста ETag нет, view ответит 404.
+    """
+    username = Post.objects.filter(pk=post_id).values_list(
+        'author__username', flat=True
+    ).first()
+    if username is None:
+        return None
+    return page_etag(request, f'post:{post_id}', f'author:{username}')
+
+
+def comments_page(post_id, cursor=None):
+    """HTML страницы комментариев к посту, по курсору, из кеша.
+
+    Ключ включает версию поста, которую сдвигает каждый новый или
+    удалённый комментарий, поэтому страницы не устаревают.
+    """
+    position = utils.decode_cursor(cursor)
+    if position is None:
+        cursor = None
+    generation, version = versions(ALL_FEEDS, f'post:{post_id}')
+    key = COMMENTS_KEY.format(post_id, f'{generation}.{version}', cursor)
+    html = cache.get(key)
+    if html is None:
+        paginator = utils.KeysetPaginator(
+            Comment.objects.filter(post_id=post_id).select_related('author'),
+            settings.COMMENTS_PER_PAGE,
+        )
+        html = render_to_string(
+            COMMENTS_TEMPLATE,
+            {'comments': paginator.page(cursor), 'post_id': post_id}
+        )
+        cache.set(key, html, settings.COMMENTS_CACHE_TIMEOUT)
+    return mark_safe(html)
@@ -0,0 +1,85 @@
+"""Денормализованные счётчики постов, комментариев и подписок.
+
+Счётчики меняются атомарным UPDATE ... SET x = x ± 1 при записи
+Post, Comment и Follow. Массовые операции (bulk_create, update)
+сигналов не вызывают, поэтому расхождения исправляет reconcile().
+"""
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Comment, Follow, Group, Post, User, UserCounter
+
+
+COUNTERS = (
+    (Post, 'pk', 'comments_count', Comment, 'post'),
+    (Group, 'pk', 'posts_count', Post, 'group'),
+    (UserCounter, 'user', 'posts_count', Post, 'author'),
+    (UserCounter, 'user', 'followers_count', Follow, 'author'),
+    (UserCounter, 'user', 'following_count', Follow, 'user'),
+)
+
+
+def change(queryset, field, delta):
+    """Сдвигает счётчик, не опуская его ниже нуля."""
+    queryset.update(**{field: Greatest(F(field) + delta, Value(0))})
+
+
+def for_user(user):
+    """Счётчики пользователя, строка создаётся при первом обращении."""
+    counters, _ = UserCounter.objects.get_or_create(user=user)
+    return counters
+
+
+def post_added(post, delta=1):
+    author = UserCounter.objects.filter(user_id=post.author_id)
+    change(author, 'posts_count', delta)
+    if post.group_id is not None:
+        change(Group.objects.filter(pk=post.group_id), 'posts_count', delta)
+
+
+def group_changed(old_group_id, new_group_id):
+    if old_group_id == new_group_id:
+        return
+    if old_group_id is not None:
+        change(Group.objects.filter(pk=old_group_id), 'posts_count', -1)
+    if new_group_id is not None:
+        change(Group.objects.filter(pk=new_group_id), 'posts_count', 1)
+
+
+def comment_added(comment, delta=1):
+    change(Post.objects.filter(pk=comment.post_id), 'comments_count', delta)
+
+
+def follow_added(follow, delta=1):
+    author = UserCounter.objects.filter(user_id=follow.author_id)
+    change(author, 'followers_count', delta)
+    user = UserCounter.objects.filter(user_id=follow.user_id)
+    change(user, 'following_count', delta)
+
+
+def _actual(source, fk, key):
+    counts = (
+        source.objects.filter(**{fk: OuterRef(key)})
+        .order_by()
+        .values(fk)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts), Value(0))
+
+
+def reconcile():
+    """Пересчитывает все счётчики, возвращает число исправленных строк."""
+    missing = User.objects.filter(
+        counters__isnull=True
+    ).values_list('pk', flat=True)
+    UserCounter.objects.bulk_create(
+        [UserCounter(user_id=pk) for pk in missing],
+        batch_size=500,
+    )
+    fixed = {}
+    for model, key, field, source, fk in COUNTERS:
+        actual = _actual(source, fk, key)
+        drifted = model.objects.exclude(**{field: actual})
+        fixed[f'{model.__name__}.{field}'] = drifted.update(**{field: actual})
+    return fixed
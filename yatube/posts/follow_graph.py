@@ -0,0 +1,94 @@
+"""Граф подписок: списки подписчиков и подписок, общие связи.
+
+Списки листаются по ключу (id пользователя), а не через OFFSET:
+подписчики автора читаются по индексу ограничения unique_follows
+(author, user), подписки пользователя - по индексу follow_user_author
+(user, author), и любая страница стоит одного поиска по индексу.
+
+Вопросы о связях начинаются с множества подписок из follow_set, оно
+уже закешировано и обычно невелико. Подписчиков в кеше нет: у
+популярного автора их миллионы, поэтому по ним идёт поиск в индексе
+unique_follows для каждого id из множества подписок.
+"""
+from django.conf import settings
+
+from . import follow_set
+from .models import Follow, User
+
+
+def _page(follows, related, after, limit):
+    limit = limit or settings.FOLLOW_LIST_PAGE_SIZE
+    field = f'{related}_id'
+    if after:
+        follows = follows.filter(**{f'{field}__gt': after})
+    rows = list(
+        follows.select_related(related).order_by(field)[:limit + 1]
+    )
+    users = [getattr(row, related) for row in rows[:limit]]
+    next_after = users[-1].pk if len(rows) > limit else None
+    return users, next_after
+
+
+def followers(user, after=None, limit=None):
+    """Страница подписчиков user по возрастанию id.
+
+    Возвращает пользователей с id больше after и id, с которого
+    начинается следующая страница, или None для последней.
+    """
+    return _page(Follow.objects.filter(author=user), 'user', after, limit)
+
+
+def following(user, after=None, limit=None):
+    """Авторы, на которых подписан user, как в followers."""
+    return _page(Follow.objects.filter(user=user), 'author', after, limit)
+
+
+def _followers_among(author, user):
+    """Подписки user, которые подписаны на author, запросом по индексу."""
+    ids = follow_set.author_ids(user)
+    if not ids:
+        return Follow.objects.none()
+    follows = Follow.objects.filter(author=author)
+    if len(ids) <= settings.FOLLOW_GRAPH_IN_LIMIT:
+        return follows.filter(user_id__in=sorted(ids))
+    # Длинный список id хуже подзапроса, который БД сведёт к соединению.
+    return follows.filter(
+        user_id__in=Follow.objects.filter(user=user).values('author_id')
+    )
+
+
+def mutual(user):
+    """id пользователей, с которыми user подписан друг на друга."""
+    return set(
+        _followers_among(user, user).values_list('user_id', flat=True)
+    )
+
+
+def is_mutual(user, other):
+    """Подписаны ли user и other друг на друга."""
+    return (
+        follow_set.contains(user, other.pk)
+        and follow_set.contains(other, user.pk)
+    )
+
+
+def follows_back(viewer, users):
+    """id тех из users, кто подписан на viewer, одним запросом."""
+    if not viewer.is_authenticated or not users:
+        return set()
+    return set(
+        Follow.objects.filter(
+            author=viewer, user_id__in=[user.pk for user in users]
+        ).values_list('user_id', flat=True)
+    )
+
+
+def followed_by_followees(viewer, author, limit=3):
+    """Сколько подписок viewer подписаны на author и первые из них."""
+    if not viewer.is_authenticated or viewer == author:
+        return 0, []
+    ids = list(
+        _followers_among(author, viewer).values_list('user_id', flat=True)
+    )
+    sample = list(User.objects.filter(pk__in=ids[:limit]))
+    return len(ids), sample
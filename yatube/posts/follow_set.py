@@ -0,0 +1,83 @@
+"""Кешированное множество авторов, на которых подписан пользователь.
+
+id авторов хранятся в кеше одним массивом 32-битных чисел и за запрос
+загружаются один раз, так что подписка на автора любой карточки ленты
+проверяется в памяти. Ключ массива содержит версию множества, и
+сигналы подписки сдвигают её, а не правят массив: два одновременных
+изменения не затрут друг друга, а массив, прочитанный из БД до
+изменения, ляжет под старый ключ и читаться уже не будет.
+
+Страницы лент кешируются целиком и различаются по Cookie. Поэтому
+подписка и отписка ставят cookie STAMP_COOKIE: у подписавшегося
+меняются ключи кеша и ETag страниц, и кнопки на них не устаревают.
+"""
+import time
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Follow
+
+
+KEY = 'follow_set:{}:{}'
+VERSION_KEY = 'follow_set_version:{}'
+STAMP_COOKIE = 'follows'
+
+
+def _load(raw):
+    ids = array('I')
+    ids.frombytes(raw)
+    return ids
+
+
+def _version(user_id):
+    key = VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def author_ids(user):
+    """frozenset id авторов, на которых подписан user."""
+    if not user.is_authenticated:
+        return frozenset()
+    if not hasattr(user, '_follow_set'):
+        key = KEY.format(user.pk, _version(user.pk))
+        raw = cache.get(key)
+        if raw is None:
+            raw = array('I', sorted(
+                Follow.objects.filter(user=user).values_list(
+                    'author_id', flat=True
+                )
+            )).tobytes()
+            cache.set(key, raw, settings.FOLLOW_SET_CACHE_TIMEOUT)
+        user._follow_set = frozenset(_load(raw))
+    return user._follow_set
+
+
+def contains(user, author_id):
+    return author_id in author_ids(user)
+
+
+def forget(*user_ids):
+    """Сбрасывает множества после изменения подписок."""
+    for user_id in user_ids:
+        try:
+            cache.incr(VERSION_KEY.format(user_id))
+        except ValueError:
+            # Версии нет в кеше: она будет создана с новым значением.
+            pass
+
+
+def stamp(response):
+    """Ставит на ответ cookie, меняющую ключи кеша страниц."""
+    response.set_cookie(
+        STAMP_COOKIE,
+        str(int(time.time() * 1000)),
+        max_age=settings.SESSION_COOKIE_AGE,
+        httponly=True,
+    )
+    return response
@@ -1,4 +1,6 @@
 from django import forms
+from django.conf import settings
+from django.template.defaultfilters import filesizeformat
 
 from .models import Post, Comment
 
@@ -13,6 +15,27 @@ class PostForm(forms.ModelForm):
             'image': 'Выберите изображение'
         }
 
+    def clean_image(self):
+        """Ограничивает размер файла и картинки.
+
+        Размеры в пикселях Pillow читает из заголовка, не раскрывая
+        картинку, так что огромные файлы отсекаются дёшево.
+        """
+        image = self.cleaned_data['image']
+        if not image or not hasattr(image, 'image'):
+            # Картинка не загружалась заново.
+            return image
+        if image.size > settings.IMAGE_UPLOAD_MAX_BYTES:
+            limit = filesizeformat(settings.IMAGE_UPLOAD_MAX_BYTES)
+            raise forms.ValidationError(f'Файл больше {limit}.')
+        width, height = image.image.size
+        if max(width, height) > settings.IMAGE_MAX_DIMENSION:
+            raise forms.ValidationError(
+                f'Картинка больше {settings.IMAGE_MAX_DIMENSION} точек '
+                f'по стороне.'
+            )
+        return image
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
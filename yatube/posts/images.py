@@ -0,0 +1,79 @@
+"""Обработка загруженных картинок постов.
+
+Пост сохраняется сразу с исходным файлом и флагом image_processing,
+а шаблоны до конца обработки показывают заглушку. Фоновая задача в
+пуле core.tasks уменьшает исходник до IMAGE_MASTER_SIZE, сохраняет
+его в WebP (или JPEG, если Pillow собран без WebP), удаляет исходник
+и создаёт миниатюры из уменьшенной копии.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+
+from core import tasks
+
+from . import caching, thumbnails
+from .models import Post
+
+
+logger = logging.getLogger(__name__)
+
+MASTER_FORMAT = 'WEBP' if features.check('webp') else 'JPEG'
+
+
+def encode(source):
+    """Уменьшенная копия картинки из файла source в MASTER_FORMAT."""
+    image = Image.open(source)
+    # Поворот из EXIF: после перекодирования метаданных не останется.
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail(
+        (settings.IMAGE_MASTER_SIZE, settings.IMAGE_MASTER_SIZE),
+        Image.LANCZOS,
+    )
+    if image.mode not in ('RGB', 'RGBA') or MASTER_FORMAT == 'JPEG':
+        image = image.convert('RGBA' if MASTER_FORMAT == 'WEBP' else 'RGB')
+    content = BytesIO()
+    image.save(content, MASTER_FORMAT, quality=settings.IMAGE_QUALITY)
+    return content.getvalue()
+
+
+def process(post_id, name):
+    """Заменяет картинку name поста post_id обработанной копией."""
+    try:
+        with default_storage.open(name) as source:
+            content = encode(source)
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        logger.warning('Картинку %s не удалось обработать: %r', name, exc)
+        master = name
+    else:
+        stem = os.path.splitext(name)[0]
+        master = default_storage.save(
+            f'{stem}.{MASTER_FORMAT.lower()}', ContentFile(content)
+        )
+    # Пока шла обработка, автор мог заменить картинку или удалить пост.
+    # updated меняется, чтобы закешированные карточки с заглушкой
+    # получили новый ключ.
+    updated = Post.objects.filter(pk=post_id, image=name).update(
+        image=master, image_processing=False, updated=timezone.now()
+    )
+    if not updated:
+        if master != name:
+            default_storage.delete(master)
+        return
+    if master != name:
+        default_storage.delete(name)
+        thumbnails.generate(master)
+    post = Post.objects.select_related('author', 'group').get(pk=post_id)
+    caching.bump(*caching.post_scopes(post))
+
+
+def schedule(post):
+    """Ставит обработку картинки поста в фоновую очередь."""
+    if post.image:
+        tasks.submit(process, post.pk, post.image.name)
@@ -0,0 +1,73 @@
+import json
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts import benchmark
+
+
+class Command(BaseCommand):
+    help = 'Строит граф подписок и замеряет запросы к нему.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50000)
+        parser.add_argument(
+            '--edges',
+            type=int,
+            default=1000000,
+            help='Подписок в графе; 0 - замерить уже созданный граф.',
+        )
+        parser.add_argument(
+            '--alpha',
+            type=float,
+            default=1.2,
+            help='Показатель степенного закона популярности авторов.',
+        )
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output',
+            default=None,
+            help='Файл JSON для результатов; по умолчанию в benchmarks/.',
+        )
+
+    def handle(self, *args, **options):
+        if options['edges']:
+            start = time.monotonic()
+            benchmark.seed_graph(
+                options['users'],
+                options['edges'],
+                alpha=options['alpha'],
+                seed=options['seed'],
+            )
+            self.stdout.write(
+                f'Граф создан за {time.monotonic() - start:.1f} с'
+            )
+        results = benchmark.graph_run(options['requests'], options['seed'])
+        for operation, metrics in results.items():
+            self.stdout.write(operation)
+            for metric, value in metrics.items():
+                self.stdout.write(f'  {metric}: {value}')
+        path = options['output'] or os.path.join(
+            settings.BASE_DIR,
+            'benchmarks',
+            timezone.now().strftime('graph-%Y%m%d-%H%M%S.json'),
+        )
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as stream:
+            json.dump(
+                {
+                    'date': timezone.now().isoformat(),
+                    'options': {
+                        key: options[key]
+                        for key in ('users', 'edges', 'alpha', 'requests')
+                    },
+                    'results': results,
+                },
+                stream,
+                indent=2,
+            )
+        self.stdout.write(self.style.SUCCESS(f'Результаты: {path}'))
@@ -0,0 +1,94 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts import benchmark
+
+
+class Command(BaseCommand):
+    help = 'Замеряет время, SQL-запросы и память страниц лент.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--views',
+            nargs='+',
+            choices=benchmark.VIEWS,
+            default=benchmark.VIEWS,
+        )
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument(
+            '--cold',
+            action='store_true',
+            help='Очищать кеш перед каждым запросом.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=0,
+            help='Одновременных запросов для замера WSGI и ASGI.',
+        )
+        parser.add_argument(
+            '--output',
+            default=None,
+            help='Файл JSON для результатов; по умолчанию в benchmarks/.',
+        )
+        parser.add_argument(
+            '--compare',
+            default=None,
+            help='Файл JSON прошлого прогона для сравнения.',
+        )
+
+    def handle(self, *args, **options):
+        results = benchmark.run(
+            options['views'],
+            options['requests'],
+            cold=options['cold'],
+            seed=options['seed'],
+        )
+        if options['concurrency']:
+            loads = benchmark.throughput(
+                options['views'],
+                options['requests'],
+                options['concurrency'],
+                seed=options['seed'],
+            )
+            for view, metrics in loads.items():
+                results[view].update(metrics)
+        previous = {}
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as stream:
+                previous = json.load(stream)['results']
+        for view, metrics in results.items():
+            self.stdout.write(view)
+            for metric, value in metrics.items():
+                line = f'  {metric}: {value}'
+                old = previous.get(view, {}).get(metric)
+                if old:
+                    line += f' ({(value - old) / old:+.1%})'
+                self.stdout.write(line)
+        path = options['output'] or os.path.join(
+            settings.BASE_DIR,
+            'benchmarks',
+            timezone.now().strftime('%Y%m%d-%H%M%S.json'),
+        )
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as stream:
+            json.dump(
+                {
+                    'date': timezone.now().isoformat(),
+                    'options': {
+                        key: options[key]
+                        for key in (
+                            'views', 'requests', 'cold', 'seed', 'concurrency'
+                        )
+                    },
+                    'results': results,
+                },
+                stream,
+                indent=2,
+            )
+        self.stdout.write(self.style.SUCCESS(f'Результаты: {path}'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts import trending
+
+
+class Command(BaseCommand):
+    help = (
+        'Состаривает оценки популярности постов и групп на время с '
+        'прошлого запуска; запускается по расписанию, обычно раз в '
+        'TRENDING_DECAY_INTERVAL секунд.'
+    )
+
+    def handle(self, *args, **options):
+        removed = trending.decay()
+        self.stdout.write(self.style.SUCCESS(
+            f'Оценки состарены, удалено остывших: {removed}.'
+        ))
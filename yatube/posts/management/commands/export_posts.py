@@ -0,0 +1,43 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = 'Выгружает группы, посты, комментарии и подписки в NDJSON или CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл или - для stdout.')
+        parser.add_argument(
+            '--format',
+            choices=transfer.FORMATS,
+            help='Формат; по умолчанию определяется по расширению.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Сколько строк читать из БД за раз.',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or (
+            'csv' if path.endswith('.csv') else 'ndjson'
+        )
+        start = time.monotonic()
+        records = transfer.export_records(options['chunk_size'])
+        if path == '-':
+            total = transfer.write_records(sys.stdout, fmt, records)
+        else:
+            with open(path, 'w', encoding='utf-8', newline='') as stream:
+                total = transfer.write_records(stream, fmt, records)
+        elapsed = time.monotonic() - start
+        # Отчёт идёт в stderr, чтобы не смешиваться с выгрузкой в stdout.
+        self.stderr.write(self.style.SUCCESS(
+            f'Выгружено записей: {total} за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-9):.0f} в секунду)'
+        ))
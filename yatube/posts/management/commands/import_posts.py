@@ -0,0 +1,58 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = 'Загружает группы, посты, комментарии и подписки из NDJSON или CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл или - для stdin.')
+        parser.add_argument(
+            '--format',
+            choices=transfer.FORMATS,
+            help='Формат; по умолчанию определяется по расширению.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько записей сохранять одним bulk_create.',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or (
+            'csv' if path.endswith('.csv') else 'ndjson'
+        )
+        importer = transfer.Importer(options['batch_size'])
+        start = time.monotonic()
+        stream = sys.stdin if path == '-' else open(
+            path, encoding='utf-8', newline=''
+        )
+        try:
+            for record in transfer.read_records(
+                stream, fmt, errors=importer.errors
+            ):
+                importer.add(record)
+            counts = importer.finish()
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        elapsed = time.monotonic() - start
+        total = sum(counts.values())
+        for kind, count in counts.items():
+            self.stdout.write(f'{kind}: {count}')
+        for error in importer.errors:
+            self.stderr.write(error)
+        if importer.errors:
+            self.stdout.write(self.style.WARNING(
+                f'Пропущено записей с ошибками: {len(importer.errors)}'
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено записей: {total} за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-9):.0f} в секунду)'
+        ))
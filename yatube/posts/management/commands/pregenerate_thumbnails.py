@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import tasks
+from posts.models import Post
+from posts.thumbnails import generate
+
+
+class Command(BaseCommand):
+    help = 'Создаёт миниатюры для всех картинок постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.TASKS_WORKERS or 2,
+            help='Количество процессов-воркеров.',
+        )
+
+    def handle(self, *args, **options):
+        names = Post.objects.exclude(image='').values_list(
+            'image', flat=True
+        ).iterator()
+        done = 0
+        with tasks.pool(options['workers']) as pool:
+            for _ in pool.map(generate, names, chunksize=16):
+                done += 1
+        self.stdout.write(self.style.SUCCESS(f'Обработано картинок: {done}'))
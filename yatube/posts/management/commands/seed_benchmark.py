@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import benchmark, transfer
+
+
+class Command(BaseCommand):
+    help = 'Заполняет базу синтетическими данными для замеров.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=50000)
+        parser.add_argument('--comments', type=int, default=100000)
+        parser.add_argument(
+            '--follows',
+            type=int,
+            default=20,
+            help='Среднее число подписок на пользователя.',
+        )
+        parser.add_argument(
+            '--alpha',
+            type=float,
+            default=1.2,
+            help='Показатель степенного закона популярности авторов.',
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        importer = transfer.Importer(options['batch_size'])
+        for record in benchmark.synthetic_records(
+            options['users'],
+            options['groups'],
+            options['posts'],
+            options['comments'],
+            options['follows'],
+            alpha=options['alpha'],
+            seed=options['seed'],
+        ):
+            importer.add(record)
+        counts = importer.finish()
+        for kind, count in counts.items():
+            self.stdout.write(f'{kind}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные созданы за {time.monotonic() - start:.1f} с'
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.19 on 2026-10-18 17:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_usercounter_unread_notifications'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_processing',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Картинка обрабатывается'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.19 on 2026-10-18 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0019_follow_user_author'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usercounter',
+            index=models.Index(fields=['-followers_count'], name='usercounter_followers'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 2.2.19 on 2026-10-18 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0021_trending_scores'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingDecay',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('decayed_at', models.DateTimeField(verbose_name='Затухание')),
+            ],
+            options={
+                'verbose_name': 'Затухание популярности',
+                'verbose_name_plural': 'Затухание популярности',
+            },
+        ),
+    ]
@@ -34,11 +34,35 @@ class Post(CreatedModel):
         upload_to='posts/',
         blank=True
     )
+    image_processing = models.BooleanField(
+        'Картинка обрабатывается',
+        default=False,
+        editable=False
+    )
+    updated = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
+    comments_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False
+    )
 
     class Meta:
         ordering = ['-pub_date']
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        indexes = [
+            models.Index(
+                fields=['author', 'pub_date'],
+                name='post_author_pub_date'
+            ),
+            models.Index(
+                fields=['group', 'pub_date'],
+                name='post_group_pub_date'
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.text[:COUNT_SYMBOLS]
@@ -56,6 +80,11 @@ class Group(models.Model):
     description = models.TextField(
         verbose_name='Описание группы'
     )
+    posts_count = models.PositiveIntegerField(
+        'Количество постов',
+        default=0,
+        editable=False
+    )
 
     class Meta:
         verbose_name = 'Группа'
@@ -85,6 +114,12 @@ class Comment(CreatedModel):
         ordering = ['-pub_date']
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['post', 'pub_date'],
+                name='comment_post_pub_date'
+            ),
+        ]
 
 
 class Follow(models.Model):
@@ -108,3 +143,111 @@ class Follow(models.Model):
                 name='unique_follows'
             )
         ]
+        # Индекс ограничения unique_follows отдаёт подписчиков автора
+        # по порядку id, этот - авторов, на которых подписан user.
+        indexes = [
+            models.Index(
+                fields=['user', 'author'],
+                name='follow_user_author'
+            ),
+        ]
+
+
+class UserCounter(models.Model):
+    """Счётчики пользователя, поддерживаемые при записи."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='counters',
+    )
+    posts_count = models.PositiveIntegerField('Постов', default=0)
+    followers_count = models.PositiveIntegerField('Подписчиков', default=0)
+    following_count = models.PositiveIntegerField('Подписок', default=0)
+    unread_notifications = models.PositiveIntegerField(
+        'Непрочитанных уведомлений',
+        default=0
+    )
+
+    class Meta:
+        verbose_name = 'Счётчики пользователя'
+        verbose_name_plural = 'Счётчики пользователей'
+        indexes = [
+            models.Index(
+                fields=['-followers_count'],
+                name='usercounter_followers'
+            ),
+        ]
+
+
+class TimelineEntry(models.Model):
+    """Запись материализованной ленты подписок пользователя."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+    )
+    post = models.ForeignKey(
+        'Post',
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        constraints = [
+            UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique_timeline_entries'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'pub_date', 'post'],
+                name='timeline_user_pub_date'
+            )
+        ]
+
+
+class PostScore(models.Model):
+    """Популярность поста, затухающая со временем (см. trending)."""
+    post = models.OneToOneField(
+        'Post',
+        on_delete=models.CASCADE,
+        related_name='trending',
+    )
+    score = models.FloatField('Оценка')
+
+    class Meta:
+        verbose_name = 'Популярность поста'
+        verbose_name_plural = 'Популярность постов'
+        indexes = [
+            models.Index(fields=['-score'], name='postscore_score'),
+        ]
+
+
+class GroupScore(models.Model):
+    """Популярность группы, затухающая со временем (см. trending)."""
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        related_name='trending',
+    )
+    score = models.FloatField('Оценка')
+
+    class Meta:
+        verbose_name = 'Популярность группы'
+        verbose_name_plural = 'Популярность групп'
+        indexes = [
+            models.Index(fields=['-score'], name='groupscore_score'),
+        ]
+
+
+class TrendingDecay(models.Model):
+    """Когда оценки популярности состарены в последний раз."""
+    decayed_at = models.DateTimeField('Затухание')
+
+    class Meta:
+        verbose_name = 'Затухание популярности'
+        verbose_name_plural = 'Затухание популярности'
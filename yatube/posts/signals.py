@@ -0,0 +1,108 @@
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from core import events
+
+from . import caching, counters, follow_set, timeline, trending
+from .models import Comment, Follow, Group, Post, User, UserCounter
+
+
+def publish_post(post):
+    """После коммита сообщает открытым лентам о новом посте."""
+    channels = ['feed']
+    if post.group_id is not None:
+        channels.append(f'group:{post.group.slug}')
+    event = {'type': 'post', 'id': post.pk}
+
+    def publish():
+        for channel in channels:
+            events.publish(channel, event)
+
+    transaction.on_commit(publish)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    if created:
+        UserCounter.objects.get_or_create(user=instance)
+
+
+@receiver(pre_save, sender=Post)
+def post_saving(sender, instance, **kwargs):
+    instance._old_group_id = None
+    if instance.pk is not None:
+        instance._old_group_id = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('group_id', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    scopes = caching.post_scopes(instance)
+    if created:
+        counters.post_added(instance)
+        trending.post_added(instance)
+        timeline.fan_out(instance)
+        publish_post(instance)
+    else:
+        counters.group_changed(instance._old_group_id, instance.group_id)
+        trending.group_changed(instance, instance._old_group_id)
+        if instance._old_group_id not in (None, instance.group_id):
+            old_group = Group.objects.get(pk=instance._old_group_id)
+            scopes.append(f'group:{old_group.slug}')
+    caching.bump(*scopes)
+
+
+@receiver(pre_delete, sender=Post)
+def post_deleting(sender, instance, **kwargs):
+    # Оценка поста удаляется каскадом раньше, чем придёт post_delete.
+    trending.post_deleting(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.post_added(instance, -1)
+    caching.bump(*caching.post_scopes(instance))
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.comment_added(instance)
+        trending.comment_added(instance)
+        event = {'type': 'comment', 'id': instance.pk}
+        transaction.on_commit(
+            lambda: events.publish(f'post:{instance.post_id}', event)
+        )
+    caching.bump(*caching.post_scopes(instance.post))
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.comment_added(instance, -1)
+    caching.bump(*caching.post_scopes(instance.post))
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, **kwargs):
+    caching.bump(caching.ALL_FEEDS)
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.follow_added(instance)
+        timeline.backfill(instance.user_id, instance.author_id)
+        follow_set.forget(instance.user_id)
+    caching.bump(*caching.follow_scopes(instance))
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.follow_added(instance, -1)
+    timeline.trim(instance.user_id, instance.author_id)
+    follow_set.forget(instance.user_id)
+    caching.bump(*caching.follow_scopes(instance))
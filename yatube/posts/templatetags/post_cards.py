@@ -0,0 +1,67 @@
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import SafeString
+
+from posts import follow_set
+
+
+register = template.Library()
+
+CARD_TEMPLATE = 'includes/article.html'
+
+
+class Card(SafeString):
+    """HTML карточки, который знает свой пост."""
+
+    def __new__(cls, html, post):
+        card = super().__new__(cls, html)
+        card.post = post
+        return card
+
+
+def card_key(post, group):
+    """Ключ карточки: меняется вместе с любым показанным в ней полем."""
+    parts = [
+        post.updated.isoformat(),
+        post.comments_count,
+        post.author.username,
+        post.author.get_full_name(),
+        bool(group),
+    ]
+    if post.group_id is not None:
+        parts += [post.group.slug, post.group.title]
+    fingerprint = hashlib.md5(repr(parts).encode()).hexdigest()
+    return f'post_card:{post.pk}:{fingerprint}'
+
+
+@register.simple_tag
+def post_cards(posts, group=None):
+    """Карточки постов: одна выборка из кеша, промахи рендерятся.
+
+    HTML карточки общий для всех посетителей, а то, что зависит от
+    пользователя, шаблон выводит рядом по card.post.
+    """
+    posts = list(posts)
+    keys = [card_key(post, group) for post in posts]
+    cards = cache.get_many(keys)
+    missing = {}
+    for key, post in zip(keys, posts):
+        if key not in cards:
+            missing[key] = render_to_string(
+                CARD_TEMPLATE, {'post': post, 'group': group}
+            )
+    if missing:
+        cache.set_many(missing, settings.POST_CARD_CACHE_TIMEOUT)
+        cards.update(missing)
+    return [Card(cards[key], post) for key, post in zip(keys, posts)]
+
+
+@register.filter
+def followed_by(author, user):
+    """Подписан ли user на author (пользователя или его id)."""
+    author_id = getattr(author, 'pk', author)
+    return follow_set.contains(user, author_id)
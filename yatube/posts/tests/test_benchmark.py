@@ -0,0 +1,67 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+
+from posts import benchmark
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class BenchmarkTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def test_seed_and_benchmark(self):
+        """Сид создаёт данные, замер сохраняет метрики всех страниц."""
+        call_command(
+            'seed_benchmark', users=20, groups=2, posts=30, comments=20,
+            follows=3, seed=1, stdout=StringIO()
+        )
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Group.objects.count(), 2)
+        self.assertEqual(Post.objects.count(), 30)
+        self.assertEqual(Comment.objects.count(), 20)
+        self.assertTrue(Follow.objects.exists())
+        path = os.path.join(self.directory, 'results.json')
+        call_command(
+            'benchmark_views', requests=3, output=path, stdout=StringIO()
+        )
+        with open(path, encoding='utf-8') as stream:
+            results = json.load(stream)['results']
+        self.assertEqual(set(results), set(benchmark.VIEWS))
+        for metrics in results.values():
+            self.assertLessEqual(metrics['p50_ms'], metrics['p99_ms'])
+            self.assertGreater(metrics['queries_max'], 0)
+
+    def test_percentile(self):
+        """Перцентиль по ближайшему рангу."""
+        values = list(range(1, 101))
+        self.assertEqual(benchmark.percentile(values, 50), 50)
+        self.assertEqual(benchmark.percentile(values, 99), 99)
+        self.assertEqual(benchmark.percentile([7], 95), 7)
+
+
+class ThroughputTests(TransactionTestCase):
+    def test_throughput(self):
+        """Замер под нагрузкой считает запросы в секунду WSGI и ASGI."""
+        call_command(
+            'seed_benchmark', users=10, groups=2, posts=20, comments=10,
+            follows=3, seed=1, stdout=StringIO()
+        )
+        results = benchmark.throughput(
+            ('index', 'follow_index'), requests=6, concurrency=3, seed=1
+        )
+        for metrics in results.values():
+            self.assertGreater(metrics['wsgi_rps'], 0)
+            self.assertGreater(metrics['asgi_rps'], 0)
@@ -0,0 +1,106 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import benchmark, follow_graph
+from posts.models import Follow, User
+
+
+class FollowGraphTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.users = [
+            User.objects.create_user(username=f'user{number}')
+            for number in range(6)
+        ]
+        # 0 и 1 подписаны друг на друга, 0 подписан на 2 и 3,
+        # 2 и 3 подписаны на 5.
+        for user, author in ((0, 1), (1, 0), (0, 2), (0, 3), (2, 5),
+                             (3, 5), (4, 5)):
+            Follow.objects.create(
+                user=cls.users[user], author=cls.users[author]
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.users = [User.objects.get(pk=user.pk) for user in self.users]
+
+    def test_followers_pages(self):
+        """Подписчики листаются по id без пропусков и повторов."""
+        author = self.users[5]
+        first, after = follow_graph.followers(author, limit=2)
+        self.assertEqual(first, self.users[2:4])
+        second, after = follow_graph.followers(author, after, limit=2)
+        self.assertEqual(second, [self.users[4]])
+        self.assertIsNone(after)
+
+    def test_following(self):
+        """Подписки пользователя по возрастанию id."""
+        users, after = follow_graph.following(self.users[0])
+        self.assertEqual(users, self.users[1:4])
+        self.assertIsNone(after)
+
+    def test_mutual(self):
+        """Взаимные подписки."""
+        self.assertEqual(follow_graph.mutual(self.users[0]), {
+            self.users[1].pk
+        })
+        self.assertTrue(follow_graph.is_mutual(*self.users[:2]))
+        self.assertFalse(follow_graph.is_mutual(self.users[0], self.users[2]))
+
+    @override_settings(FOLLOW_GRAPH_IN_LIMIT=1)
+    def test_followed_by_followees(self):
+        """Подписки зрителя, подписанные на автора, через подзапрос."""
+        count, sample = follow_graph.followed_by_followees(
+            self.users[0], self.users[5], limit=1
+        )
+        self.assertEqual(count, 2)
+        self.assertEqual(len(sample), 1)
+        self.assertIn(sample[0], self.users[2:4])
+
+    def test_follow_list_pages(self):
+        """Страницы подписчиков и подписок."""
+        client = Client()
+        client.force_login(self.users[0])
+        response = client.get(
+            reverse('posts:followers', args=[self.users[0].username])
+        )
+        self.assertEqual(response.context['users'], [self.users[1]])
+        self.assertEqual(response.context['follows_back'], {
+            self.users[1].pk
+        })
+        response = client.get(
+            reverse('posts:following', args=[self.users[0].username])
+        )
+        self.assertEqual(response.context['users'], self.users[1:4])
+        response = client.get(
+            reverse('posts:following', args=[self.users[0].username]),
+            {'after': '²'}
+        )
+        self.assertEqual(response.context['users'], self.users[1:4])
+
+    def test_graph_benchmark(self):
+        """Замер графа строит подписки и считает метрики операций."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'graph.json')
+            call_command(
+                'benchmark_follow_graph', users=30, edges=100, requests=3,
+                output=path, stdout=StringIO()
+            )
+            with open(path, encoding='utf-8') as stream:
+                results = json.load(stream)['results']
+        self.assertEqual(
+            Follow.objects.filter(user__username__startswith='graph_').count(),
+            100,
+        )
+        self.assertEqual(results['followers']['queries_max'], 1)
+        edges = list(benchmark.power_law_edges(30, 100, seed=1))
+        self.assertEqual(len(set(edges)), 100)
+        self.assertTrue(all(user != author for user, author in edges))
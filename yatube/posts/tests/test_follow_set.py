@@ -0,0 +1,93 @@
+from array import array
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import follow_set
+from posts.models import Follow, Post, User
+
+
+class FollowSetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='Chitatel')
+        cls.authors = [
+            User.objects.create_user(username=f'Avtor{number}')
+            for number in range(3)
+        ]
+        for author in cls.authors:
+            Post.objects.create(author=author, text=f'Пост {author}')
+        Follow.objects.create(user=cls.reader, author=cls.authors[0])
+
+    def setUp(self):
+        cache.clear()
+        # Свежий объект: множество запоминается на пользователе.
+        self.reader = User.objects.get(pk=self.reader.pk)
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_loaded_once(self):
+        """Множество читается из БД один раз, потом из кеша и памяти."""
+        with self.assertNumQueries(1):
+            self.assertTrue(
+                follow_set.contains(self.reader, self.authors[0].pk)
+            )
+            self.assertFalse(
+                follow_set.contains(self.reader, self.authors[1].pk)
+            )
+        reader = User.objects.get(pk=self.reader.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                follow_set.author_ids(reader), {self.authors[0].pk}
+            )
+
+    def test_follow_updates_cached_set(self):
+        """Подписка и отписка сбрасывают закешированное множество."""
+        follow_set.author_ids(self.reader)
+        author = self.authors[1]
+        response = self.client.get(
+            reverse('posts:profile_follow', args=[author.username])
+        )
+        self.assertIn(follow_set.STAMP_COOKIE, response.cookies)
+        reader = User.objects.get(pk=self.reader.pk)
+        with self.assertNumQueries(1):
+            self.assertTrue(follow_set.contains(reader, author.pk))
+        self.client.get(
+            reverse('posts:profile_unfollow', args=[author.username])
+        )
+        reader = User.objects.get(pk=self.reader.pk)
+        self.assertFalse(follow_set.contains(reader, author.pk))
+
+    def test_stale_load_is_not_cached(self):
+        """Множество, прочитанное до подписки, не переживает её."""
+        author = self.authors[1]
+        key = follow_set.KEY.format(
+            self.reader.pk, follow_set._version(self.reader.pk)
+        )
+        Follow.objects.create(user=self.reader, author=author)
+        # Запрос, прочитавший подписки до неё, кладёт в кеш старый массив.
+        cache.set(key, array('I', [self.authors[0].pk]).tobytes())
+        reader = User.objects.get(pk=self.reader.pk)
+        self.assertTrue(follow_set.contains(reader, author.pk))
+
+    def test_feed_buttons(self):
+        """Карточки ленты показывают кнопку подписки на автора."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(
+            response,
+            reverse('posts:profile_unfollow', args=[self.authors[0]]),
+        )
+        for author in self.authors[1:]:
+            self.assertContains(
+                response, reverse('posts:profile_follow', args=[author])
+            )
+        self.client.get(
+            reverse('posts:profile_follow', args=[self.authors[1]])
+        )
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(
+            response,
+            reverse('posts:profile_unfollow', args=[self.authors[1]]),
+        )
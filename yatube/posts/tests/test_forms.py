@@ -1,6 +1,7 @@
 import shutil
 import tempfile
 from http import HTTPStatus
+from unittest import mock
 
 from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
@@ -8,6 +9,7 @@ from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
 from posts.models import Post, User, Group, Comment
+from posts.images import process
 
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
@@ -73,6 +75,26 @@ class PostCreateForm(TestCase):
         self.assertEqual(Post.objects.count(), count_posts + 1)
         self.assertEqual(response.status_code, HTTPStatus.OK)
 
+    @mock.patch('core.tasks.submit')
+    def test_create_post_schedules_image_processing(self, submit):
+        """После сохранения картинки её обработка ставится в очередь."""
+        uploaded = SimpleUploadedFile(
+            name='thumb.gif',
+            content=(
+                b'\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x00\x00'
+                b'\x00\x2C\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02'
+                b'\x00\x3B'
+            ),
+            content_type='image/gif'
+        )
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Пост с картинкой', 'image': uploaded},
+        )
+        post = Post.objects.get(text='Пост с картинкой')
+        self.assertTrue(post.image_processing)
+        submit.assert_any_call(process, post.pk, post.image.name)
+
     def test_edit_post(self):
         """Проверка валидации и изменения записи в БД."""
         post = Post.objects.create(
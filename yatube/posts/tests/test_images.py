@@ -0,0 +1,113 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts import images
+from posts.models import Post, User
+
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def png(size):
+    content = BytesIO()
+    Image.new('RGB', size, (200, 30, 30)).save(content, 'PNG')
+    return content.getvalue()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, IMAGE_MASTER_SIZE=100)
+class ImageProcessingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Avtoritto')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def create_post(self, size=(300, 200)):
+        name = default_storage.save('posts/big.png', ContentFile(png(size)))
+        return Post.objects.create(
+            author=self.user, text='Пост', image=name, image_processing=True
+        )
+
+    def test_process_reencodes_image(self):
+        """Обработка уменьшает картинку и заменяет исходный файл."""
+        post = self.create_post()
+        original = post.image.name
+        images.process(post.pk, original)
+        post.refresh_from_db()
+        self.assertFalse(post.image_processing)
+        self.assertTrue(
+            post.image.name.endswith(f'.{images.MASTER_FORMAT.lower()}')
+        )
+        self.assertFalse(default_storage.exists(original))
+        with default_storage.open(post.image.name) as stream:
+            self.assertEqual(Image.open(stream).size, (100, 67))
+
+    def test_process_keeps_replaced_image(self):
+        """Если картинку уже заменили, результат обработки выбрасывается."""
+        post = self.create_post()
+        original = post.image.name
+        Post.objects.filter(pk=post.pk).update(image='posts/other.png')
+        images.process(post.pk, original)
+        post.refresh_from_db()
+        self.assertEqual(post.image.name, 'posts/other.png')
+        self.assertTrue(post.image_processing)
+
+    def test_placeholder_while_processing(self):
+        """Пока картинка обрабатывается, на странице поста заглушка."""
+        post = self.create_post()
+        response = self.client.get(
+            reverse('posts:post_detail', args=[post.pk])
+        )
+        self.assertContains(response, 'Картинка обрабатывается')
+
+    def test_feed_card_updated_after_processing(self):
+        """После обработки лента показывает картинку, а не заглушку."""
+        post = self.create_post()
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Картинка обрабатывается')
+        images.process(post.pk, post.image.name)
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotContains(response, 'Картинка обрабатывается')
+
+    def upload(self, size):
+        return self.client.post(
+            reverse('posts:post_create'),
+            {
+                'text': 'Пост с картинкой',
+                'image': SimpleUploadedFile('big.png', png(size)),
+            },
+        )
+
+    @override_settings(IMAGE_MAX_DIMENSION=100)
+    def test_form_rejects_large_dimensions(self):
+        """Картинка больше IMAGE_MAX_DIMENSION по стороне отклоняется."""
+        response = self.upload((101, 10))
+        self.assertFormError(
+            response, 'form', 'image', 'Картинка больше 100 точек по стороне.'
+        )
+        self.assertFalse(Post.objects.filter(text='Пост с картинкой').exists())
+
+    @override_settings(IMAGE_UPLOAD_MAX_BYTES=10)
+    def test_form_rejects_large_files(self):
+        """Файл больше IMAGE_UPLOAD_MAX_BYTES отклоняется."""
+        response = self.upload((10, 10))
+        self.assertFormError(
+            response, 'form', 'image', 'Файл больше 10\xa0байт.'
+        )
@@ -0,0 +1,83 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class QueryPlanTests(TestCase):
+    """Ленты читаются по составным индексам без сортировки в памяти."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Avtoritto')
+        cls.reader = User.objects.create_user(username='Chitatel')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='group',
+            description='Описание',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for number in range(3):
+            cls.post = Post.objects.create(
+                author=cls.author,
+                group=cls.group,
+                text=f'Пост номер {number}',
+            )
+            Comment.objects.create(
+                post=cls.post,
+                author=cls.reader,
+                text=f'Комментарий номер {number}',
+            )
+        cls.pages = {
+            reverse('posts:profile', args=[cls.author.username]):
+            'post_author_pub_date',
+            reverse('posts:group_list', args=[cls.group.slug]):
+            'post_group_pub_date',
+            reverse('posts:post_detail', args=[cls.post.pk]):
+            'comment_post_pub_date',
+            reverse('posts:follow_index'):
+            'timeline_user_pub_date',
+            reverse('posts:trending'): 'postscore_score',
+        }
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(QueryPlanTests.reader)
+
+    def sorted_query_plans(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        plans = []
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT') or 'ORDER BY' not in sql:
+                    continue
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                plans.append(' | '.join(row[-1] for row in cursor.fetchall()))
+        return plans
+
+    def check_plans(self):
+        for url, index in self.pages.items():
+            with self.subTest(url=url):
+                plans = self.sorted_query_plans(url)
+                self.assertTrue(
+                    any(index in plan for plan in plans),
+                    f'{index} не используется: {plans}'
+                )
+                for plan in plans:
+                    self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_offset_pages_use_indexes(self):
+        """Постраничные ленты используют составные индексы."""
+        self.check_plans()
+
+    @override_settings(PAGINATOR_KEYSET=True)
+    def test_keyset_pages_use_indexes(self):
+        """Ленты с курсором используют составные индексы."""
+        self.check_plans()
@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.queries import QueryBudgetMixin
+from core.routers import STICKY_COOKIE
+from posts import timeline
+from posts.models import Follow, Post, TimelineEntry, User
+
+
+class TimelineTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Avtoritto')
+        cls.reader = User.objects.create_user(username='Chitatel')
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(TimelineTests.reader)
+
+    def follow_page(self):
+        response = self.reader_client.get(reverse('posts:follow_index'))
+        return list(response.context['page_obj'])
+
+    def test_new_post_fans_out_to_followers(self):
+        """Новый пост автора попадает в ленту подписчика."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post).exists()
+        )
+        self.assertEqual(self.follow_page(), [post])
+
+    def test_follow_backfills_and_unfollow_trims(self):
+        """Подписка переносит старые посты, отписка их убирает."""
+        post = Post.objects.create(author=self.author, text='Старый пост')
+        self.reader_client.get(
+            reverse('posts:profile_follow', args=[self.author.username])
+        )
+        self.assertEqual(self.follow_page(), [post])
+        self.reader_client.get(
+            reverse('posts:profile_unfollow', args=[self.author.username])
+        )
+        self.assertFalse(TimelineEntry.objects.filter(user=self.reader))
+        self.assertEqual(self.follow_page(), [])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_popular_author_posts_are_pulled_on_read(self):
+        """Посты популярного автора подтягиваются при чтении ленты."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.follow_page()
+        post = Post.objects.create(author=self.author, text='Для всех')
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertEqual(self.follow_page(), [post])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_late_commit_is_not_skipped(self):
+        """Пост, ставший виден после чтения, подтянется в следующий раз."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        first = Post.objects.create(author=self.author, text='Первый')
+        self.follow_page()
+        # pub_date ставится до коммита: пост старше отметки чтения.
+        late = Post.objects.create(author=self.author, text='Поздний')
+        Post.objects.filter(pk=late.pk).update(
+            pub_date=first.pub_date - timedelta(seconds=1)
+        )
+        self.assertEqual(self.follow_page(), [first, late])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_pull_is_one_query_for_all_authors(self):
+        """Посты всех популярных авторов читаются одним запросом."""
+        others = [
+            User.objects.create_user(username=f'star{number}')
+            for number in range(3)
+        ]
+        for author in others:
+            Follow.objects.create(user=self.reader, author=author)
+            Post.objects.create(author=author, text='Звёздный пост')
+        # Подписки, посты популярных авторов и вставка в ленту.
+        with self.assertNumQueries(3):
+            timeline.pull(self.reader)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 3
+        )
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_repeated_pull_does_not_write(self):
+        """Без новых постов чтение ленты не пишет в базу."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        Post.objects.create(author=self.author, text='Для всех')
+        timeline.pull(self.reader)
+        # Подписки и посты популярных авторов, без вставки.
+        with self.assertNumQueries(2):
+            timeline.pull(self.reader)
+        response = self.reader_client.get(reverse('posts:follow_index'))
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_pull_fits_follow_index_budget(self):
+        """Лента с постами популярных авторов укладывается в бюджет."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.follow_page()
+        Post.objects.create(author=self.author, text='Для всех')
+        # Первый запрос добавляет новый пост, второй ничего не пишет.
+        for _ in range(2):
+            cache.clear()
+            self.assertQueryBudget(
+                self.reader_client, reverse('posts:follow_index')
+            )
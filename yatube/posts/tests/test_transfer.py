@@ -0,0 +1,151 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from posts import timeline
+from posts.models import (
+    Comment, Follow, Group, Post, TimelineEntry, User, UserCounter
+)
+from search.index import SearchResults
+
+
+class TransferTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def setUp(self):
+        author = User.objects.create_user(username='Avtoritto')
+        reader = User.objects.create_user(username='Chitatel')
+        group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        self.old_date = timezone.now() - timedelta(days=30)
+        post = Post.objects.create(author=author, text='Старый пост')
+        Post.objects.filter(pk=post.pk).update(pub_date=self.old_date)
+        Post.objects.create(author=author, text='Пост в группе', group=group)
+        Comment.objects.create(post=post, author=reader, text='Ответ')
+        Follow.objects.create(user=reader, author=author)
+
+    def roundtrip(self, name):
+        path = os.path.join(self.directory, name)
+        call_command('export_posts', path, stderr=StringIO())
+        for model in (Comment, Follow, Post, Group, User):
+            model.objects.all().delete()
+        call_command(
+            'import_posts', path, batch_size=2, stdout=StringIO()
+        )
+
+    def test_roundtrip(self):
+        """Выгрузка и загрузка восстанавливают данные и производные."""
+        for name in ('dump.ndjson', 'dump.csv'):
+            with self.subTest(name=name):
+                self.roundtrip(name)
+                post = Post.objects.get(text='Старый пост')
+                self.assertEqual(post.pub_date, self.old_date)
+                self.assertEqual(post.comments_count, 1)
+                self.assertEqual(
+                    Post.objects.get(text='Пост в группе').group.slug,
+                    'group'
+                )
+                self.assertEqual(Group.objects.get().posts_count, 1)
+                reader = User.objects.get(username='Chitatel')
+                self.assertFalse(reader.has_usable_password())
+                self.assertTrue(
+                    Follow.objects.filter(
+                        user=reader, author__username='Avtoritto'
+                    ).exists()
+                )
+                self.assertEqual(
+                    TimelineEntry.objects.filter(user=reader).count(), 2
+                )
+                self.assertEqual(
+                    UserCounter.objects.get(
+                        user__username='Avtoritto'
+                    ).posts_count,
+                    2
+                )
+                self.assertEqual(list(SearchResults('ответ')), [post])
+
+    def load(self, lines, **options):
+        path = os.path.join(self.directory, 'load.ndjson')
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write('\n'.join(lines))
+        out, err = StringIO(), StringIO()
+        call_command(
+            'import_posts', path, batch_size=10, stdout=out, stderr=err,
+            **options
+        )
+        return out.getvalue(), err.getvalue()
+
+    def test_bad_records_are_reported(self):
+        """Плохие записи пропускаются с описанием, остальные загружаются."""
+        out, err = self.load([
+            '{"type": "post", "author": "Avtoritto", "text": "Хороший"}',
+            '{"type": "post", "author": "Avtoritto", "text": "Дата", '
+            '"pub_date": "вчера"}',
+            '{"type": "post", "author": "Avtoritto"}',
+            '{"type": "comment", "post": 999999, "author": "Chitatel", '
+            '"text": "Куда?"}',
+            '{"type": "poll"}',
+            'не json',
+        ])
+        self.assertTrue(Post.objects.filter(text='Хороший').exists())
+        self.assertFalse(Post.objects.filter(text='Дата').exists())
+        self.assertIn('Пропущено записей с ошибками: 5', out)
+        self.assertIn("Запись 2 (post): Неверная дата 'вчера'", err)
+        self.assertIn("Запись 3 (post): нет поля 'text'", err)
+        self.assertIn('Запись 4 (comment): Нет постов [999999]', err)
+        self.assertIn("Запись 5: неизвестный тип записи 'poll'", err)
+        self.assertIn('Строка 6:', err)
+
+    def test_follow_backfill_per_follower(self):
+        """Ленты заполняются одной выборкой постов на подписчика."""
+        authors = [f'Avtor{number}' for number in range(5)]
+        lines = [
+            f'{{"type": "post", "author": "{author}", "text": "Пост"}}'
+            for author in authors
+        ]
+        self.load(lines)
+        path = os.path.join(self.directory, 'follows.ndjson')
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write('\n'.join(
+                f'{{"type": "follow", "user": "Chitatel", '
+                f'"author": "{author}"}}'
+                for author in authors
+            ))
+        backfill = mock.patch(
+            'posts.transfer.timeline.backfill', wraps=timeline.backfill
+        )
+        with backfill as calls:
+            call_command('import_posts', path, stdout=StringIO())
+        calls.assert_called_once()
+        reader = User.objects.get(username='Chitatel')
+        self.assertEqual(
+            TimelineEntry.objects.filter(
+                user=reader, post__author__username__in=authors
+            ).count(),
+            5
+        )
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_import_respects_fanout_limit(self):
+        """Посты популярного автора не раскладываются по лентам."""
+        self.load([
+            '{"type": "post", "author": "Avtoritto", "text": "Для всех"}',
+        ])
+        post = Post.objects.get(text='Для всех')
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
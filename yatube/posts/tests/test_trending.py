@@ -0,0 +1,121 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import trending
+from posts.models import (
+    Comment, Group, GroupScore, Post, PostScore, TrendingDecay, User
+)
+
+
+@override_settings(
+    TRENDING_POST_WEIGHT=1.0,
+    TRENDING_COMMENT_WEIGHT=2.0,
+    TRENDING_HALF_LIFE=60,
+    TRENDING_MIN_SCORE=0.6,
+    TRENDING_DECAY_INTERVAL=0,
+)
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.quiet = Post.objects.create(author=self.author, text='Тихий')
+        self.hot = Post.objects.create(
+            author=self.author, group=self.group, text='Обсуждаемый'
+        )
+
+    def comment(self, post):
+        Comment.objects.create(post=post, author=self.author, text='Да')
+
+    def score(self, post):
+        return PostScore.objects.get(post=post).score
+
+    def test_events_add_weight(self):
+        """Публикация и комментарии увеличивают оценки поста и группы."""
+        self.comment(self.hot)
+        self.comment(self.hot)
+        self.assertEqual(self.score(self.quiet), 1.0)
+        self.assertEqual(self.score(self.hot), 5.0)
+        self.assertEqual(GroupScore.objects.get(group=self.group).score, 5.0)
+        self.assertEqual(
+            list(trending.posts()), [self.hot, self.quiet]
+        )
+        self.assertEqual(trending.groups(), [self.group])
+
+    def test_group_change_moves_score(self):
+        """Перенос поста переносит его оценку в новую группу."""
+        self.comment(self.hot)
+        other = Group.objects.create(
+            title='Другая', slug='other', description='Описание'
+        )
+        self.hot.group = other
+        self.hot.save()
+        self.assertFalse(GroupScore.objects.filter(group=self.group))
+        self.assertEqual(GroupScore.objects.get(group=other).score, 3.0)
+        self.assertEqual(trending.groups(), [other])
+
+    def test_delete_removes_score(self):
+        """Удалённый пост не держит оценку своей группы."""
+        self.comment(self.hot)
+        Post.objects.create(
+            author=self.author, group=self.group, text='Ещё один'
+        )
+        self.hot.delete()
+        self.assertEqual(GroupScore.objects.get(group=self.group).score, 1.0)
+
+    def test_decay(self):
+        """Затухание делит оценки пополам за период и удаляет остывшие."""
+        self.comment(self.hot)
+        start = timezone.now()
+        self.assertEqual(trending.decay(now=start), 0)
+        self.assertEqual(self.score(self.hot), 3.0)
+        self.assertEqual(
+            trending.decay(now=start + timedelta(seconds=60)), 1
+        )
+        self.assertFalse(PostScore.objects.filter(post=self.quiet).exists())
+        self.assertEqual(self.score(self.hot), 1.5)
+        self.comment(self.hot)
+        self.assertEqual(self.score(self.hot), 3.5)
+
+    def test_decay_uses_elapsed_time(self):
+        """Множитель зависит от прошедшего времени, а не от числа запусков."""
+        self.comment(self.hot)
+        start = timezone.now()
+        trending.decay(now=start)
+        # Пропущенный запуск: прошло два периода полураспада.
+        trending.decay(now=start + timedelta(seconds=120))
+        self.assertEqual(self.score(self.hot), 0.75)
+        # Лишний запуск сразу следом ничего не меняет.
+        trending.decay(now=start + timedelta(seconds=120))
+        self.assertEqual(self.score(self.hot), 0.75)
+
+    def test_command(self):
+        """Команда decay_trending состаривает оценки."""
+        TrendingDecay.objects.create(
+            decayed_at=timezone.now() - timedelta(seconds=120)
+        )
+        out = StringIO()
+        call_command('decay_trending', stdout=out)
+        self.assertIn('удалено остывших: 3', out.getvalue())
+        self.assertFalse(PostScore.objects.exists())
+
+    def test_page(self):
+        """Страница популярного: посты по оценке и группы."""
+        self.comment(self.hot)
+        response = Client().get(reverse('posts:trending'))
+        self.assertEqual(
+            list(response.context['page_obj']), [self.hot, self.quiet]
+        )
+        self.assertEqual(response.context['groups'], [self.group])
@@ -9,15 +9,18 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.cache import cache
 
 
+from core.queries import QueryBudgetMixin
 from posts.models import Post, Group, User, Follow, Comment
+from posts import caching, thumbnails, utils
 from posts.forms import PostForm, CommentForm
+from posts.templatetags.post_cards import post_cards
 
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
 
 @override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
-class PostsViewsTests(TestCase):
+class PostsViewsTests(QueryBudgetMixin, TestCase):
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
@@ -135,15 +138,63 @@ class PostsViewsTests(TestCase):
         """Кеширование posts:index работатет."""
         response = self.authorized_client.get(reverse('posts:index'))
         page_content = response.content
-        Post.objects.first().delete()
+        Post.objects.update(text='Текст без сигналов')
         response = self.authorized_client.get(reverse('posts:index'))
         cached_page_content = response.content
-        cache.clear()
+        Post.objects.first().delete()
         response = self.authorized_client.get(reverse('posts:index'))
         cleared_page_content = response.content
         self.assertEqual(page_content, cached_page_content)
         self.assertNotEqual(cached_page_content, cleared_page_content)
 
+    def test_feed_cache_invalidation(self):
+        """Запись поста или комментария сбрасывает кеш нужных лент."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+        )
+        writes = (
+            lambda: Post.objects.create(
+                author=self.user,
+                text='Свежий пост',
+                group=self.group,
+            ),
+            lambda: Comment.objects.create(
+                post=self.post,
+                author=self.user,
+                text='Свежий комментарий',
+            ),
+        )
+        for write in writes:
+            pages = [self.guest_client.get(url).content for url in urls]
+            write()
+            for url, page in zip(urls, pages):
+                with self.subTest(url=url):
+                    response = self.guest_client.get(url)
+                    self.assertNotEqual(response.content, page)
+
+    def test_post_cards_fragment_cache(self):
+        """Карточки постов берутся из кеша до изменения поста."""
+        posts = Post.objects.select_related('author', 'group')
+        cards = post_cards(posts)
+        Post.objects.update(text='Текст без сигналов')
+        self.assertEqual(post_cards(posts.all()), cards)
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Отредактированный текст'
+        post.save()
+        self.assertIn('Отредактированный текст', post_cards(posts.all())[0])
+        self.group.title = 'Новое название'
+        self.group.save()
+        self.assertIn('Новое название', post_cards(posts.all())[0])
+
+    def test_cached_feed_is_per_visitor(self):
+        """Закешированная лента не отдаётся другому посетителю."""
+        cache.clear()
+        self.authorized_client.get(reverse('posts:index'))
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertNotContains(response, reverse('users:logout'))
+
     def test_group_list_context(self):
         """Проверка контекста в group_list."""
         name_url, _, args = PostsViewsTests.list_urls['group_list']
@@ -181,7 +232,7 @@ class PostsViewsTests(TestCase):
         self.assertIsInstance(form, CommentForm)
         self.assertIsInstance(form.fields['text'], form_fields['text'])
         self.context_check(response)
-        self.assertEqual(response.context['comments'].first(), comment)
+        self.assertContains(response, comment.text)
 
     def test_create_post_context(self):
         """Проверка контекста в create_post."""
@@ -341,3 +392,180 @@ class PostsViewsTests(TestCase):
                 len(response.context['page_obj']),
                 SECOND_PAGE_AMOUNT
             )
+
+    @override_settings(PAGINATOR_WINDOW=2)
+    def test_paginator_window(self):
+        """Паджинатор выводит окно страниц и поправляет номер страницы."""
+        Post.objects.bulk_create(
+            Post(text=f'Постик {i}', author=PostsViewsTests.user)
+            for i in range(settings.PAGINATOR_COUNT_POSTS * 8)
+        )
+        url = reverse('posts:index')
+        last = -(-Post.objects.count() // settings.PAGINATOR_COUNT_POSTS)
+        cases = {
+            '5': (5, range(3, 8)),
+            '1': (1, range(1, 4)),
+            'abc': (1, range(1, 4)),
+            '-3': (1, range(1, 4)),
+            '²': (1, range(1, 4)),
+            '9' * 50: (last, range(last - 2, last + 1)),
+        }
+        for page, (number, window) in cases.items():
+            with self.subTest(page=page):
+                page_obj = self.guest_client.get(
+                    url, {'page': page}
+                ).context['page_obj']
+                self.assertEqual(page_obj.number, number)
+                self.assertEqual(page_obj.page_window, window)
+
+    def test_feed_count_is_cached(self):
+        """Число постов ленты считается один раз на версию ленты."""
+        posts = Post.objects.all()
+        count = caching.feed_count('index', posts)
+        with self.assertNumQueries(0):
+            self.assertEqual(caching.feed_count('index', posts), count)
+        Post.objects.create(text='Новый', author=PostsViewsTests.user)
+        self.assertEqual(caching.feed_count('index', posts), count + 1)
+
+    @override_settings(PAGINATOR_KEYSET=True)
+    def test_keyset_paginator(self):
+        """Проверка паджинации по курсору."""
+        posts_list = [
+            Post(
+                text=f'Постик под номером {i}',
+                author=PostsViewsTests.user,
+                group=PostsViewsTests.group
+            ) for i in range(settings.PAGINATOR_COUNT_POSTS)
+        ]
+        Post.objects.bulk_create(posts_list)
+        expected = list(Post.objects.order_by('-pub_date', '-pk'))
+        for page in ('index', 'group_list', 'profile'):
+            name_url, _, args = PostsViewsTests.list_urls[page]
+            url = reverse(name_url, kwargs=args)
+            with self.subTest(page=page):
+                first_page = self.guest_client.get(url).context['page_obj']
+                self.assertEqual(
+                    list(first_page),
+                    expected[:settings.PAGINATOR_COUNT_POSTS]
+                )
+                self.assertFalse(first_page.has_previous())
+                second_page = self.guest_client.get(
+                    url, {'cursor': first_page.next_cursor}
+                ).context['page_obj']
+                self.assertEqual(
+                    list(second_page),
+                    expected[settings.PAGINATOR_COUNT_POSTS:]
+                )
+                self.assertFalse(second_page.has_next())
+                back_page = self.guest_client.get(
+                    url, {'cursor': second_page.previous_cursor}
+                ).context['page_obj']
+                self.assertEqual(list(back_page), list(first_page))
+                self.assertFalse(back_page.has_previous())
+                broken_page = self.guest_client.get(
+                    url, {'cursor': 'мусор'}
+                ).context['page_obj']
+                self.assertEqual(list(broken_page), list(first_page))
+
+    def test_views_query_budget(self):
+        """Страницы укладываются в бюджет запросов без N+1."""
+        author = User.objects.create_user(username='Drugoi')
+        Follow.objects.create(user=PostsViewsTests.user, author=author)
+        Post.objects.bulk_create(
+            Post(
+                text=f'Постик под номером {i}',
+                author=author if i % 2 else PostsViewsTests.user,
+                group=PostsViewsTests.group
+            ) for i in range(settings.PAGINATOR_COUNT_POSTS)
+        )
+        Comment.objects.bulk_create(
+            Comment(post=PostsViewsTests.post, author=author, text=f'{i}')
+            for i in range(5)
+        )
+        for page, (name_url, _, args) in PostsViewsTests.list_urls.items():
+            with self.subTest(page=page):
+                cache.clear()
+                # Миниатюры создаются заранее, как после загрузки поста.
+                thumbnails.generate(PostsViewsTests.post.image.name)
+                self.assertQueryBudget(
+                    self.authorized_client, reverse(name_url, kwargs=args)
+                )
+        username = PostsViewsTests.user.username
+        post_id = PostsViewsTests.post.pk
+        for name_url, args, data, method in (
+            ('posts:followers', [author.username], None, 'get'),
+            ('posts:following', [username], None, 'get'),
+            ('posts:trending', [], None, 'get'),
+            ('posts:comments', [post_id], None, 'get'),
+            ('posts:add_comment', [post_id], {'text': 'Ещё'}, 'post'),
+            ('posts:profile_unfollow', [author.username], None, 'get'),
+            ('posts:profile_follow', [author.username], None, 'get'),
+            ('posts:events', [], {'channel': 'feed'}, 'get'),
+        ):
+            with self.subTest(page=name_url):
+                cache.clear()
+                thumbnails.generate(PostsViewsTests.post.image.name)
+                self.assertQueryBudget(
+                    self.authorized_client,
+                    reverse(name_url, args=args),
+                    data,
+                    method,
+                )
+
+    def test_conditional_get(self):
+        """Неизменившиеся страницы отдаются ответом 304."""
+        pages = {
+            'group_list': 0,
+            'profile': 0,
+            'post_detail': 1,
+        }
+        for page, queries in pages.items():
+            name_url, _, args = PostsViewsTests.list_urls[page]
+            url = reverse(name_url, kwargs=args)
+            with self.subTest(page=page):
+                tag = self.guest_client.get(url)['ETag']
+                with self.assertNumQueries(queries):
+                    response = self.guest_client.get(
+                        url, HTTP_IF_NONE_MATCH=tag
+                    )
+                self.assertEqual(response.status_code, 304)
+                response = self.authorized_client.get(
+                    url, HTTP_IF_NONE_MATCH=tag
+                )
+                self.assertEqual(response.status_code, 200)
+                comment = Comment.objects.create(
+                    post=PostsViewsTests.post,
+                    author=PostsViewsTests.user,
+                    text='Новый комментарий'
+                )
+                response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=tag)
+                self.assertEqual(response.status_code, 200)
+                comment.delete()
+
+    @override_settings(COMMENTS_PER_PAGE=2)
+    def test_post_detail_comments_pages(self):
+        """Комментарии листаются курсором и подгружаются фрагментом."""
+        post = PostsViewsTests.post
+        comments = [
+            Comment.objects.create(
+                post=post, author=PostsViewsTests.user, text=f'Коммент {i}'
+            ) for i in range(3)
+        ]
+        url = reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        embedded = self.guest_client.get(url)
+        self.assertContains(embedded, 'Коммент 2')
+        self.assertContains(embedded, 'Коммент 1')
+        self.assertNotContains(embedded, 'Коммент 0')
+        cursor = utils.encode_cursor(utils.CURSOR_NEXT, comments[1])
+        fragment_url = reverse('posts:comments', kwargs={'post_id': post.pk})
+        self.assertContains(embedded, f'{fragment_url}?cursor={cursor}')
+        fragment = self.guest_client.get(fragment_url, {'cursor': cursor})
+        self.assertContains(fragment, 'Коммент 0')
+        self.assertNotContains(fragment, 'Коммент 1')
+        with self.assertNumQueries(0):
+            self.guest_client.get(fragment_url, {'cursor': cursor})
+        self.authorized_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': post.pk}),
+            {'text': 'Свежий коммент'}
+        )
+        self.assertContains(self.guest_client.get(url), 'Свежий коммент')
@@ -0,0 +1,19 @@
+"""Заблаговременное создание миниатюр картинок постов.
+
+Размеры должны совпадать с тегами {% thumbnail %} в шаблонах
+includes/article.html и posts/post_detail.html, иначе sorl будет
+создавать миниатюру при первом просмотре страницы. Миниатюры
+создаёт images.process после перекодирования загруженной картинки.
+"""
+from sorl.thumbnail import get_thumbnail
+
+
+THUMBNAIL_SIZES = (
+    ('960x339', {'crop': 'center', 'upscale': True}),
+)
+
+
+def generate(name):
+    """Создаёт все миниатюры картинки по её имени в хранилище."""
+    for geometry, options in THUMBNAIL_SIZES:
+        get_thumbnail(name, geometry, **options)
@@ -0,0 +1,355 @@
+"""Потоковые импорт и экспорт групп, постов, комментариев и подписок.
+
+Поток - это записи-словари с полем type (group, post, comment,
+follow) в формате NDJSON или CSV. Запись ссылается на автора и группу
+по username и slug, на пост - по id, поэтому экспорт из одной базы
+загружается в другую. Экспорт пишет записи в порядке групп, постов,
+комментариев и подписок, так что ссылки всегда указывают назад.
+
+Импорт копит записи пачками и сохраняет их bulk_create, каждую пачку
+в своей транзакции. bulk_create не отправляет сигналов, поэтому
+ленты подписок и поисковый индекс обновляются пачками здесь же, а
+счётчики пересчитываются один раз в конце. Если пачка не сохранилась
+из-за плохой записи, её записи сохраняются по одной, а ошибочные
+пропускаются и попадают в Importer.errors.
+"""
+import csv
+import json
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import DataError, IntegrityError, connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from search import index as search_index
+
+from . import caching, counters, follow_set, timeline
+from .models import Comment, Follow, Group, Post, User
+
+
+FORMATS = ('ndjson', 'csv')
+TYPES = ('group', 'post', 'comment', 'follow')
+CSV_FIELDS = (
+    'type', 'id', 'slug', 'title', 'description', 'author', 'group',
+    'text', 'pub_date', 'image', 'post', 'user',
+)
+
+
+# Ошибки одной записи: импорт пропускает её и идёт дальше.
+RECORD_ERRORS = (DataError, IntegrityError, KeyError, ValueError)
+
+
+class TransferError(ValueError):
+    pass
+
+
+def describe(exc):
+    if isinstance(exc, KeyError):
+        return f'нет поля {exc}'
+    return str(exc)
+
+
+def read_records(stream, fmt, errors=None):
+    """Записи из текстового потока по одной.
+
+    Если передан список errors, неразборчивые строки описываются в
+    нём и пропускаются, иначе поднимают TransferError.
+    """
+    if fmt == 'csv':
+        for row in csv.DictReader(stream):
+            yield {field: value for field, value in row.items() if value}
+        return
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            if errors is None:
+                raise TransferError(f'Строка {number}: {exc}')
+            errors.append(f'Строка {number}: {exc}')
+            continue
+        yield record
+
+
+def write_records(stream, fmt, records):
+    """Пишет записи в текстовый поток, возвращает их число."""
+    written = 0
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, CSV_FIELDS)
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            written += 1
+        return written
+    for record in records:
+        stream.write(json.dumps(record, ensure_ascii=False))
+        stream.write('\n')
+        written += 1
+    return written
+
+
+def export_records(chunk_size=2000):
+    """Все данные для импорта, без загрузки таблиц в память."""
+    groups = Group.objects.order_by('pk').values_list(
+        'slug', 'title', 'description'
+    )
+    for slug, title, description in groups.iterator(chunk_size):
+        yield {
+            'type': 'group',
+            'slug': slug,
+            'title': title,
+            'description': description,
+        }
+    posts = Post.objects.order_by('pk').values_list(
+        'pk', 'author__username', 'group__slug', 'text', 'pub_date', 'image'
+    )
+    for pk, author, group, text, pub_date, image in posts.iterator(
+        chunk_size
+    ):
+        yield {
+            'type': 'post',
+            'id': pk,
+            'author': author,
+            'group': group,
+            'text': text,
+            'pub_date': pub_date.isoformat(),
+            'image': image,
+        }
+    comments = Comment.objects.order_by('pk').values_list(
+        'pk', 'post_id', 'author__username', 'text', 'pub_date'
+    )
+    for pk, post, author, text, pub_date in comments.iterator(chunk_size):
+        yield {
+            'type': 'comment',
+            'id': pk,
+            'post': post,
+            'author': author,
+            'text': text,
+            'pub_date': pub_date.isoformat(),
+        }
+    follows = Follow.objects.order_by('pk').values_list(
+        'user__username', 'author__username'
+    )
+    for user, author in follows.iterator(chunk_size):
+        yield {'type': 'follow', 'user': user, 'author': author}
+
+
+@contextmanager
+def keep_pub_dates():
+    """Сохраняет pub_date из файла вместо auto_now_add."""
+    fields = [model._meta.get_field('pub_date') for model in (Post, Comment)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Importer:
+    """Загружает записи пачками по batch_size.
+
+    Пачки сохраняются по порядку зависимостей: группы, посты,
+    комментарии, подписки. Пользователи, которых ещё нет, создаются
+    без пароля. id постов и комментариев из файла сохраняются, записи
+    без id получают следующие свободные. Плохие записи пропускаются,
+    errors - их номера по порядку в потоке и причины.
+    """
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.pending = {kind: [] for kind in TYPES}
+        self.counts = dict.fromkeys(TYPES, 0)
+        self.errors = []
+        self.seen = 0
+        self.users = {}
+        self.groups = {}
+        self.next_ids = {}
+
+    def add(self, record):
+        self.seen += 1
+        kind = record.get('type') if isinstance(record, dict) else None
+        if kind not in TYPES:
+            self.errors.append(
+                f'Запись {self.seen}: неизвестный тип записи {kind!r}'
+            )
+            return
+        self.pending[kind].append((self.seen, record))
+        if len(self.pending[kind]) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        with keep_pub_dates():
+            for kind in TYPES:
+                batch, self.pending[kind] = self.pending[kind], []
+                if batch:
+                    self._save(kind, batch)
+
+    def _save(self, kind, batch):
+        save = getattr(self, f'_save_{kind}s')
+        if self._attempt(save, [record for _, record in batch]) is None:
+            self.counts[kind] += len(batch)
+            return
+        for number, record in batch:
+            exc = self._attempt(save, [record])
+            if exc is None:
+                self.counts[kind] += 1
+            else:
+                self.errors.append(
+                    f'Запись {number} ({kind}): {describe(exc)}'
+                )
+
+    def _attempt(self, save, records):
+        """Сохраняет записи в транзакции, возвращает ошибку или None."""
+        # Откат транзакции отменяет и созданных в ней пользователей.
+        state = dict(self.users), dict(self.groups), dict(self.next_ids)
+        try:
+            with transaction.atomic():
+                save(records)
+        except RECORD_ERRORS as exc:
+            self.users, self.groups, self.next_ids = state
+            return exc
+        return None
+
+    def finish(self):
+        """Сохраняет остаток и приводит в порядок производные данные."""
+        self.flush()
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(), [Group, Post, Comment, Follow]
+            ):
+                cursor.execute(sql)
+        counters.reconcile()
+        caching.bump(caching.ALL_FEEDS)
+        return self.counts
+
+    def _user_ids(self, usernames):
+        missing = set(usernames) - set(self.users)
+        if missing:
+            found = dict(
+                User.objects.filter(username__in=missing)
+                .values_list('username', 'pk')
+            )
+            new = missing - set(found)
+            if new:
+                User.objects.bulk_create(
+                    User(username=name, password=make_password(None))
+                    for name in new
+                )
+                found.update(
+                    User.objects.filter(username__in=new)
+                    .values_list('username', 'pk')
+                )
+            self.users.update(found)
+        return [self.users[name] for name in usernames]
+
+    def _group_id(self, slug):
+        if not slug:
+            return None
+        if slug not in self.groups:
+            group_id = Group.objects.filter(slug=slug).values_list(
+                'pk', flat=True
+            ).first()
+            if group_id is None:
+                raise TransferError(f'Нет группы {slug!r}')
+            self.groups[slug] = group_id
+        return self.groups[slug]
+
+    def _id(self, model, record):
+        if record.get('id'):
+            return int(record['id'])
+        if model not in self.next_ids:
+            last = model.objects.aggregate(last=Max('pk'))['last']
+            self.next_ids[model] = (last or 0) + 1
+        pk = self.next_ids[model]
+        self.next_ids[model] += 1
+        return pk
+
+    def _pub_date(self, record):
+        value = record.get('pub_date')
+        if not value:
+            return timezone.now()
+        pub_date = parse_datetime(value)
+        if pub_date is None:
+            raise TransferError(f'Неверная дата {value!r}')
+        return pub_date
+
+    def _save_groups(self, records):
+        existing = set(
+            Group.objects.filter(
+                slug__in=[record['slug'] for record in records]
+            ).values_list('slug', flat=True)
+        )
+        Group.objects.bulk_create(
+            Group(
+                slug=record['slug'],
+                title=record.get('title', record['slug']),
+                description=record.get('description', ''),
+            )
+            for record in records if record['slug'] not in existing
+        )
+
+    def _save_posts(self, records):
+        authors = self._user_ids([record['author'] for record in records])
+        posts = Post.objects.bulk_create(
+            Post(
+                pk=self._id(Post, record),
+                author_id=author_id,
+                group_id=self._group_id(record.get('group')),
+                text=record['text'],
+                pub_date=self._pub_date(record),
+                image=record.get('image', ''),
+            )
+            for record, author_id in zip(records, authors)
+        )
+        timeline.fan_out(*posts)
+        for post in posts:
+            search_index.index_post(post)
+
+    def _save_comments(self, records):
+        post_ids = [int(record['post']) for record in records]
+        # Внешние ключи проверяются только при коммите, поэтому ссылки
+        # на несуществующие посты ловятся заранее.
+        missing = set(post_ids) - set(
+            Post.objects.filter(pk__in=post_ids).values_list('pk', flat=True)
+        )
+        if missing:
+            raise TransferError(f'Нет постов {sorted(missing)}')
+        authors = self._user_ids([record['author'] for record in records])
+        comments = Comment.objects.bulk_create(
+            Comment(
+                pk=self._id(Comment, record),
+                post_id=post_id,
+                author_id=author_id,
+                text=record['text'],
+                pub_date=self._pub_date(record),
+            )
+            for record, post_id, author_id in zip(records, post_ids, authors)
+        )
+        for comment in comments:
+            search_index.index_comment(comment)
+
+    def _save_follows(self, records):
+        users = self._user_ids([record['user'] for record in records])
+        authors = self._user_ids([record['author'] for record in records])
+        pairs = {
+            (user_id, author_id) for user_id, author_id in zip(users, authors)
+            if user_id != author_id
+        }
+        Follow.objects.bulk_create(
+            [Follow(user_id=user, author_id=author) for user, author in pairs],
+            ignore_conflicts=True,
+        )
+        # Одна выборка постов на подписчика, а не на каждую подписку.
+        authors_of = defaultdict(list)
+        for user_id, author_id in pairs:
+            authors_of[user_id].append(author_id)
+        for user_id, author_ids in authors_of.items():
+            timeline.backfill(user_id, *author_ids)
+        follow_set.forget(*authors_of)
@@ -0,0 +1,130 @@
+"""Популярные посты и группы.
+
+Оценка - сумма весов событий: публикации поста и комментариев к нему,
+причём вес каждого события убывает вдвое за TRENDING_HALF_LIFE.
+Событие прибавляет свой вес к оценкам поста и его группы одним
+атомарным UPDATE. Оценка группы - сумма оценок её постов, поэтому
+при переносе поста в другую группу или его удалении оценка поста
+вычитается из прежней группы.
+
+Затухание общее для всех строк, поэтому его делает decay() по
+расписанию: умножает все оценки на один множитель, что не меняет их
+порядка, и удаляет остывшие строки. Множитель считается по времени с
+прошлого затухания из TrendingDecay, так что пропущенный или лишний
+запуск не искажает оценки. Таблицы остаются маленькими, а страница
+читает их по индексу оценки.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import GroupScore, Post, PostScore, TrendingDecay
+
+
+def _add(model, field, pk, weight):
+    scores = model.objects.filter(**{field: pk})
+    if scores.update(score=F('score') + weight):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**{field: pk, 'score': weight})
+    except IntegrityError:
+        # Строку только что создал параллельный запрос.
+        scores.update(score=F('score') + weight)
+
+
+def record(post, weight):
+    _add(PostScore, 'post_id', post.pk, weight)
+    if post.group_id is not None:
+        _add(GroupScore, 'group_id', post.group_id, weight)
+
+
+def _post_score(post_id):
+    return PostScore.objects.filter(post_id=post_id).values_list(
+        'score', flat=True
+    ).first()
+
+
+def _take(group_id, score):
+    scores = GroupScore.objects.filter(group_id=group_id)
+    scores.update(score=F('score') - score)
+    # Остывшую группу убираем сразу, как это сделало бы затухание.
+    scores.filter(score__lt=settings.TRENDING_MIN_SCORE).delete()
+
+
+def group_changed(post, old_group_id):
+    """Переносит текущую оценку поста из прежней группы в новую."""
+    if old_group_id == post.group_id:
+        return
+    score = _post_score(post.pk)
+    if not score:
+        return
+    if old_group_id is not None:
+        _take(old_group_id, score)
+    if post.group_id is not None:
+        _add(GroupScore, 'group_id', post.group_id, score)
+
+
+def post_deleting(post):
+    """Вычитает оценку удаляемого поста из оценки его группы."""
+    if post.group_id is None:
+        return
+    score = _post_score(post.pk)
+    if score:
+        _take(post.group_id, score)
+
+
+def post_added(post):
+    record(post, settings.TRENDING_POST_WEIGHT)
+
+
+def comment_added(comment):
+    record(comment.post, settings.TRENDING_COMMENT_WEIGHT)
+
+
+def decay(now=None):
+    """Состаривает оценки на время с прошлого раза, удаляет остывшие.
+
+    При первом запуске прошедшим считается TRENDING_DECAY_INTERVAL.
+    Возвращает число удалённых строк.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        # Блокировка строки: параллельный запуск дождётся этого и
+        # состарит оценки только на прошедшее после него время.
+        clock = TrendingDecay.objects.select_for_update().first()
+        if clock is None:
+            clock = TrendingDecay(decayed_at=now - timedelta(
+                seconds=settings.TRENDING_DECAY_INTERVAL
+            ))
+        elapsed = max((now - clock.decayed_at).total_seconds(), 0)
+        factor = 0.5 ** (elapsed / settings.TRENDING_HALF_LIFE)
+        removed = 0
+        for model in (PostScore, GroupScore):
+            model.objects.update(score=F('score') * factor)
+            removed += model.objects.filter(
+                score__lt=settings.TRENDING_MIN_SCORE
+            ).delete()[0]
+        clock.decayed_at = max(clock.decayed_at, now)
+        clock.save()
+    return removed
+
+
+def posts():
+    """Популярные посты по убыванию оценки."""
+    return Post.objects.filter(trending__isnull=False).select_related(
+        'author', 'group'
+    ).order_by('-trending__score')
+
+
+def groups(limit=None):
+    """Самые популярные группы."""
+    limit = limit or settings.TRENDING_GROUPS_SHOWN
+    return [
+        score.group for score in GroupScore.objects.select_related(
+            'group'
+        ).order_by('-score')[:limit]
+    ]
@@ -20,6 +20,16 @@ urlpatterns = [
         views.profile,
         name='profile'
     ),
+    path(
+        'profile/<str:username>/followers/',
+        views.followers,
+        name='followers'
+    ),
+    path(
+        'profile/<str:username>/following/',
+        views.following,
+        name='following'
+    ),
     path(
         'posts/<int:post_id>/',
         views.post_detail,
@@ -50,11 +60,26 @@ urlpatterns = [
         views.game_snake,
         name='game_second'
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='comments'
+    ),
     path(
         'posts/<int:post_id>/comment/',
         views.add_comment,
         name='add_comment'
     ),
+    path(
+        'events/',
+        views.events,
+        name='events'
+    ),
+    path(
+        'trending/',
+        views.trending_index,
+        name='trending'
+    ),
     path(
         'follow/',
         views.follow_index,
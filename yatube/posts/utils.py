@@ -1,9 +1,187 @@
-from django.core.paginator import Paginator
+import base64
+import binascii
+
 from django.conf import settings
+from django.core.paginator import Page, Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+
+CURSOR_NEXT = 'n'
+CURSOR_PREVIOUS = 'p'
+
+
+def encode_cursor(direction, obj):
+    """Непрозрачный курсор из пары (pub_date, id) объекта."""
+    raw = f'{direction}|{obj.pub_date.isoformat()}|{obj.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Разбирает курсор, для мусора возвращает None."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        direction, pub_date, pk = raw.decode().split('|')
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if direction not in (CURSOR_NEXT, CURSOR_PREVIOUS) or pub_date is None:
+        return None
+    return direction, pub_date, pk
+
+
+class KeysetPage(Page):
+    """Страница, которая знает только соседние курсоры, а не свой номер."""
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        super().__init__(object_list, None, paginator)
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<Keyset page>'
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+class KeysetPaginator(Paginator):
+    """Паджинатор по ключу (pub_date, id) без COUNT(*) и OFFSET.
+
+    Стоимость любой страницы одинакова: фильтр по ключу последнего
+    показанного объекта и LIMIT на размер страницы. key - поля, по
+    которым сортируется и фильтруется выборка; их значения должны
+    совпадать с pub_date и pk объектов (например, поля записи ленты).
+    """
+
+    def __init__(self, object_list, per_page, key=('pub_date', 'pk')):
+        super().__init__(object_list, per_page)
+        self.date_field, self.pk_field = key
+
+    def _after(self, pub_date, pk, older):
+        lookup = 'lt' if older else 'gt'
+        date_field, pk_field = self.date_field, self.pk_field
+        return (
+            Q(**{f'{date_field}__{lookup}': pub_date})
+            | Q(**{date_field: pub_date, f'{pk_field}__{lookup}': pk})
+        )
+
+    def page(self, cursor=None):
+        queryset = self.object_list
+        newest_first = (f'-{self.date_field}', f'-{self.pk_field}')
+        oldest_first = (self.date_field, self.pk_field)
+        position = decode_cursor(cursor)
+        if position is None:
+            direction = CURSOR_NEXT
+            ordering = newest_first
+        else:
+            direction, pub_date, pk = position
+            older = direction == CURSOR_NEXT
+            queryset = queryset.filter(self._after(pub_date, pk, older))
+            ordering = newest_first if older else oldest_first
+        objects = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(objects) > self.per_page
+        objects = objects[:self.per_page]
+        if direction == CURSOR_PREVIOUS:
+            objects.reverse()
+            has_older, has_newer = True, has_more
+        else:
+            has_older, has_newer = has_more, position is not None
+        next_cursor = previous_cursor = None
+        if objects and has_older:
+            next_cursor = encode_cursor(CURSOR_NEXT, objects[-1])
+        if objects and has_newer:
+            previous_cursor = encode_cursor(CURSOR_PREVIOUS, objects[0])
+        return KeysetPage(objects, self, next_cursor, previous_cursor)
+
+    def get_page(self, cursor=None):
+        return self.page(cursor)
+
+
+def estimated_count(queryset):
+    """Число строк выборки, для больших таблиц PostgreSQL - оценка.
+
+    Оценку даёт план запроса без его выполнения. Если она меньше
+    PAGINATOR_ESTIMATE_ABOVE, а также на других СУБД выполняется
+    обычный COUNT(*).
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        sql, params = queryset.order_by().values('pk').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            estimate = cursor.fetchone()[0][0]['Plan']['Plan Rows']
+        if estimate >= settings.PAGINATOR_ESTIMATE_ABOVE:
+            return estimate
+    return queryset.count()
+
+
+class WindowedPaginator(Paginator):
+    """Паджинатор с готовым или оценённым числом объектов.
+
+    count можно передать готовым, например из кеша, тогда COUNT(*) не
+    выполняется. Страница получает page_window - номера страниц в окне
+    PAGINATOR_WINDOW вокруг текущей: шаблон выводит их, а не весь
+    page_range.
+    """
+
+    def __init__(self, object_list, per_page, count=None, window=None):
+        super().__init__(object_list, per_page)
+        if count is not None:
+            self.count = count
+        self.window = window or settings.PAGINATOR_WINDOW
+
+    @cached_property
+    def count(self):
+        if isinstance(self.object_list, QuerySet):
+            return estimated_count(self.object_list)
+        return super().count
+
+    def get_page(self, number):
+        """Страница number; мусор ведёт на первую, лишнее - на последнюю."""
+        number = str(number or '')
+        # isdigit() пропускает '²', который int() не разберёт.
+        if not number.isdecimal():
+            number = 1
+        elif len(number) > 9:
+            # Огромные числа не разбираются: дальше последней нельзя.
+            number = self.num_pages
+        return super().get_page(min(int(number), self.num_pages) or 1)
+
+    def _get_page(self, object_list, number, paginator):
+        page = super()._get_page(object_list, number, paginator)
+        page.page_window = range(
+            max(1, number - self.window),
+            min(self.num_pages, number + self.window) + 1,
+        )
+        return page
+
 
+def paginator(request, posts, keyset=None, key=('pub_date', 'pk'),
+              count=None):
+    """Страница из request для выборки posts.
 
-def paginator(request, posts):
-    paginator = Paginator(posts, settings.PAGINATOR_COUNT_POSTS)
+    count - известное число объектов, например из caching.feed_count.
+    """
+    if keyset is None:
+        keyset = settings.PAGINATOR_KEYSET
+    if keyset:
+        paginator = KeysetPaginator(
+            posts, settings.PAGINATOR_COUNT_POSTS, key
+        )
+        return paginator.get_page(request.GET.get('cursor'))
+    paginator = WindowedPaginator(
+        posts, settings.PAGINATOR_COUNT_POSTS, count
+    )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return page_obj
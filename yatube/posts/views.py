@@ -1,27 +1,52 @@
+import re
+
 from django.contrib.auth.decorators import login_required
+from django.http import (
+    HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+)
 from django.shortcuts import render, get_object_or_404, redirect
-from django.views.decorators.cache import cache_page
+from django.views.decorators.http import condition
 
+from core import events as live
+from core.queries import query_budget
+from core.routers import read_only
+from recommendations import engine as recommendations
 
-from . import utils
+from . import (
+    caching, counters, follow_graph, follow_set, images, timeline, trending,
+    utils
+)
+from .caching import cache_feed, feed_etag, post_etag
 from .forms import PostForm, CommentForm
 from .models import Post, Group, User, Follow
 
+LIVE_CHANNEL = re.compile(r'(feed|group:[-\w]+|post:\d+)')
+
 
-@cache_page(20, key_prefix='index_page')
+@read_only
+@query_budget(5)
+@cache_feed('index')
 def index(request):
     posts = Post.objects.select_related('group', 'author')
-    page_obj = utils.paginator(request, posts)
+    page_obj = utils.paginator(
+        request, posts, count=caching.feed_count('index', posts)
+    )
     context = {
         'page_obj': page_obj,
     }
     return render(request, 'posts/index.html', context)
 
 
+@read_only
+@query_budget(6)
+@condition(etag_func=feed_etag('group:{slug}'))
+@cache_feed('group:{slug}')
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    page_obj = utils.paginator(request, posts)
+    posts = group.posts.select_related('author', 'group')
+    page_obj = utils.paginator(
+        request, posts, count=caching.feed_count(f'group:{slug}', posts)
+    )
     context = {
         'group': group,
         'page_obj': page_obj,
@@ -29,35 +54,50 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@read_only
+@query_budget(9)
+@condition(etag_func=feed_etag('author:{username}'))
+@cache_feed('author:{username}')
 def profile(request, username):
     profile = get_object_or_404(User, username=username)
     posts = profile.posts.all().select_related('author', 'group')
-    page_obj = utils.paginator(request, posts)
-    following = (
-        request.user.is_authenticated and request.user.follower.filter(
-            user=request.user,
-            author=profile
-        ).exists()
+    page_obj = utils.paginator(
+        request, posts, count=caching.feed_count(f'author:{username}', posts)
     )
     context = {
         'page_obj': page_obj,
         'profile': profile,
-        'following': following,
+        'counters': counters.for_user(profile),
+        'following': follow_set.contains(request.user, profile.pk),
+        'mutual': follow_graph.is_mutual(request.user, profile),
+        'followed_by': follow_graph.followed_by_followees(
+            request.user, profile
+        ),
+        'recommended': (
+            recommendations.for_user(request.user)
+            if request.user == profile else []
+        ),
     }
     return render(request, 'posts/profile.html', context)
 
 
+@read_only
+@query_budget(5)
+@condition(etag_func=post_etag)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    comments = post.comments.all().select_related('author', 'post')
+    post = get_object_or_404(
+        Post.objects.select_related('author__counters', 'group'),
+        pk=post_id
+    )
     context = {
         'post': post,
         'form': CommentForm(),
-        'comments': comments
+        'comments': caching.comments_page(post.pk, request.GET.get('cursor'))
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@query_budget(10)
 @login_required
 def post_create(request):
     form = PostForm(
@@ -67,7 +107,9 @@ def post_create(request):
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
+        post.image_processing = bool(post.image)
         post.save()
+        images.schedule(post)
         return redirect('posts:profile', username=post.author)
     return render(
         request,
@@ -76,6 +118,7 @@ def post_create(request):
     )
 
 
+@query_budget(10)
 @login_required
 def post_edit(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
@@ -87,7 +130,11 @@ def post_edit(request, post_id):
     if post.author != request.user:
         return redirect('posts:post_detail', post_id)
     if form.is_valid():
+        if 'image' in form.changed_data:
+            post.image_processing = bool(post.image)
         form.save()
+        if 'image' in form.changed_data:
+            images.schedule(post)
         return redirect('posts:post_detail', post_id)
     return render(
         request,
@@ -96,53 +143,135 @@ def post_edit(request, post_id):
     )
 
 
+@read_only
+@query_budget(1)
+def post_comments(request, post_id):
+    html = caching.comments_page(post_id, request.GET.get('cursor'))
+    return HttpResponse(html)
+
+
+@query_budget(9)
 @login_required
 def add_comment(request, post_id):
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
-        comment.post = get_object_or_404(Post, pk=post_id)
+        # Автор и группа нужны сигналам, чтобы сбросить версии лент.
+        comment.post = get_object_or_404(
+            Post.objects.select_related('author', 'group'), pk=post_id
+        )
         comment.save()
     return redirect('posts:post_detail', post_id=post_id)
 
 
+@read_only
+@query_budget(9)
+def trending_index(request):
+    # Оценки меняются постоянно, курсор по ним не устойчив.
+    page_obj = utils.paginator(request, trending.posts(), keyset=False)
+    context = {
+        'page_obj': page_obj,
+        'groups': trending.groups(),
+    }
+    return render(request, 'posts/trending.html', context)
+
+
+@read_only
+# Три запроса из бюджета - подтягивание постов популярных авторов:
+# список авторов, их посты и вставка новых в ленту.
+@query_budget(10)
 @login_required
 def follow_index(request):
-    user = request.user
-    posts = Post.objects.filter(author__following__user=user)
-    page_obj = utils.paginator(request, posts)
+    posts = timeline.feed(request.user)
+    page_obj = utils.paginator(request, posts, key=timeline.FEED_KEY)
     context = {
         'page_obj': page_obj,
+        'recommended': recommendations.for_user(request.user),
     }
     return render(request, 'posts/follow.html', context)
 
 
+def follow_list(request, username, page, title):
+    profile = get_object_or_404(User, username=username)
+    after = request.GET.get('after', '')
+    users, next_after = page(
+        profile, int(after) if after.isdecimal() else None
+    )
+    context = {
+        'profile': profile,
+        'users': users,
+        'follows_back': follow_graph.follows_back(request.user, users),
+        'next_after': next_after,
+        'after': after,
+        'title': title,
+    }
+    return render(request, 'posts/follow_list.html', context)
+
+
+@read_only
+@query_budget(6)
+def followers(request, username):
+    return follow_list(
+        request, username, follow_graph.followers, 'Подписчики'
+    )
+
+
+@read_only
+@query_budget(6)
+def following(request, username):
+    return follow_list(
+        request, username, follow_graph.following, 'Подписки'
+    )
+
+
+@query_budget(14)
 @login_required
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     following = Follow.objects.filter(user=request.user, author=author)
     if author != request.user or following.exists():
         Follow.objects.get_or_create(user=request.user, author=author)
-    return redirect('posts:profile', author.username)
+    return follow_set.stamp(redirect('posts:profile', author.username))
 
 
+@query_budget(10)
 @login_required
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
     Follow.objects.filter(user=request.user, author=author).delete()
-    return redirect('posts:profile', author.username)
+    return follow_set.stamp(redirect('posts:profile', author.username))
+
+
+@query_budget(0)
+def events(request):
+    channel = request.GET.get('channel', '')
+    if not LIVE_CHANNEL.fullmatch(channel):
+        return HttpResponseBadRequest()
+    after = request.META.get('HTTP_LAST_EVENT_ID') or live.broker().position(
+        channel
+    )
+    response = StreamingHttpResponse(
+        live.stream(channel, after), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    # nginx не должен копить поток в буфере.
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
+@query_budget(2)
 def game(request):
     return render(request, 'includes/choose_game.html')
 
 
+@query_budget(2)
 def game_tetris(request):
     context = {'type_game': 'tetris'}
     return render(request, 'includes/game.html', context)
 
 
+@query_budget(2)
 def game_snake(request):
     context = {'type_game': 'snake'}
     return render(request, 'includes/game.html', context)
@@ -0,0 +1,298 @@
+"""Расчёт рекомендаций авторов по графу подписок.
+
+Сходство авторов a и b - косинус их множеств подписчиков:
+|F(a) ∩ F(b)| / sqrt(|F(a)| * |F(b)|). Для каждого автора хранятся
+RECOMMENDATIONS_NEIGHBORS самых похожих (AuthorNeighbor).
+
+Оценка автора b для пользователя u - сумма сходств b с авторами, на
+которых подписан u, плюс RECOMMENDATIONS_GROUP_WEIGHT, умноженный на
+долю групп b среди групп этих авторов. Для каждого пользователя
+хранятся RECOMMENDATIONS_TOP_K лучших кандидатов (Recommendation),
+страница читает их одним запросом по индексу.
+
+build() загружает граф в разреженные матрицы SciPy и считает оценки
+матричными произведениями для всех пользователей разом.
+python_scores() - тот же расчёт на словарях, по нему проверяется
+матричный. refresh_user() после подписки или отписки пересчитывает
+одного пользователя по сохранённым соседям его авторов.
+
+Блок рекомендаций виден в своём профиле, который кешируется, поэтому
+после пересчёта версии профилей сдвигаются.
+"""
+import heapq
+import math
+from collections import Counter, defaultdict
+from itertools import islice
+from operator import itemgetter
+
+import numpy
+from django.conf import settings
+from django.db import transaction
+from scipy import sparse
+
+from posts import caching, follow_set
+from posts.models import Follow, Post, User, UserCounter
+
+from .models import AuthorNeighbor, Recommendation
+
+
+def author_groups(author_ids=None):
+    """Группы, в которых писал каждый автор."""
+    posts = Post.objects.filter(group__isnull=False)
+    if author_ids is not None:
+        posts = posts.filter(author_id__in=author_ids)
+    groups = defaultdict(set)
+    for author_id, group_id in posts.values_list(
+        'author_id', 'group_id'
+    ).distinct().iterator():
+        groups[author_id].add(group_id)
+    return groups
+
+
+def rank(user_id, followed, neighbors, groups):
+    """Лучшие кандидаты пользователя: список пар (автор, оценка).
+
+    neighbors - соседи авторов из followed, groups - группы этих
+    авторов и их соседей.
+    """
+    scores = Counter()
+    for author_id in followed:
+        for neighbor_id, similarity in neighbors.get(author_id, ()):
+            scores[neighbor_id] += similarity
+    for author_id in followed | {user_id}:
+        scores.pop(author_id, None)
+    profile = Counter()
+    for author_id in followed:
+        profile.update(groups.get(author_id, ()))
+    total = sum(profile.values())
+    weight = settings.RECOMMENDATIONS_GROUP_WEIGHT
+    if total and weight:
+        for author_id in scores:
+            shared = sum(profile[g] for g in groups.get(author_id, ()))
+            scores[author_id] += weight * shared / total
+    return heapq.nlargest(
+        settings.RECOMMENDATIONS_TOP_K, scores.items(), key=itemgetter(1)
+    )
+
+
+def python_scores(edges, groups):
+    """Соседи авторов и рекомендации на словарях Python, эталон."""
+    followees = defaultdict(set)
+    followers = defaultdict(set)
+    for user_id, author_id in edges:
+        followees[user_id].add(author_id)
+        followers[author_id].add(user_id)
+    neighbors = {}
+    for author_id, fans in followers.items():
+        common = Counter()
+        for user_id in fans:
+            common.update(followees[user_id])
+        common.pop(author_id, None)
+        neighbors[author_id] = heapq.nlargest(
+            settings.RECOMMENDATIONS_NEIGHBORS,
+            (
+                (other, count / math.sqrt(len(fans) * len(followers[other])))
+                for other, count in common.items()
+            ),
+            key=itemgetter(1),
+        )
+    recommendations = (
+        (user_id, rank(user_id, followed, neighbors, groups))
+        for user_id, followed in followees.items()
+    )
+    return neighbors.items(), recommendations
+
+
+def _top_per_row(matrix, k):
+    """Копия CSR-матрицы, где в каждой строке оставлено k наибольших."""
+    rows, cols, data = [], [], []
+    for row in range(matrix.shape[0]):
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        values = matrix.data[start:end]
+        best = numpy.arange(len(values))
+        if len(values) > k:
+            best = numpy.argpartition(-values, k)[:k]
+        rows.append(numpy.full(len(best), row))
+        cols.append(matrix.indices[start:end][best])
+        data.append(values[best])
+    return sparse.csr_matrix(
+        (numpy.concatenate(data), (numpy.concatenate(rows),
+                                   numpy.concatenate(cols))),
+        shape=matrix.shape,
+    )
+
+
+def _row(matrix, row):
+    start, end = matrix.indptr[row], matrix.indptr[row + 1]
+    return matrix.indices[start:end], matrix.data[start:end]
+
+
+def _membership(ids, groups):
+    """Матрица автор x группа: 1, если автор из ids писал в группу."""
+    group_ids = sorted({group for ids_ in groups.values() for group in ids_})
+    group_index = {group: number for number, group in enumerate(group_ids)}
+    membership = sparse.lil_matrix((len(ids), max(len(group_ids), 1)))
+    for author_id, author_group_ids in groups.items():
+        row = numpy.searchsorted(ids, author_id)
+        if row < len(ids) and ids[row] == author_id:
+            for group in author_group_ids:
+                membership[row, group_index[group]] = 1
+    return membership.tocsr()
+
+
+def sparse_scores(edges, groups):
+    """То же, что python_scores, разреженными матрицами SciPy."""
+    if not edges:
+        return [], iter(())
+    edges = numpy.array(edges, dtype=numpy.int64).reshape(-1, 2)
+    ids = numpy.unique(edges)
+    size = len(ids)
+    follows = sparse.csr_matrix(
+        (
+            numpy.ones(len(edges)),
+            (numpy.searchsorted(ids, edges[:, 0]),
+             numpy.searchsorted(ids, edges[:, 1])),
+        ),
+        shape=(size, size),
+    )
+    fans = numpy.asarray(follows.sum(axis=0)).ravel()
+    common = (follows.T @ follows).tocsr()
+    common.setdiag(0)
+    common.eliminate_zeros()
+    norm = sparse.diags(1 / numpy.sqrt(numpy.maximum(fans, 1)))
+    similarity = (norm @ common @ norm).tocsr()
+    nearest = _top_per_row(similarity, settings.RECOMMENDATIONS_NEIGHBORS)
+    neighbors = []
+    for row in range(size):
+        cols, values = _row(nearest, row)
+        if len(cols):
+            order = numpy.argsort(-values)
+            neighbors.append((
+                int(ids[row]),
+                list(zip(ids[cols[order]].tolist(), values[order].tolist())),
+            ))
+    membership = _membership(ids, groups)
+    profile = (follows @ membership).tocsr()
+    totals = numpy.asarray(profile.sum(axis=1)).ravel()
+    profile = (sparse.diags(1 / numpy.maximum(totals, 1)) @ profile).tocsr()
+    scores = (follows @ nearest).tocsr()
+    weight = settings.RECOMMENDATIONS_GROUP_WEIGHT
+    top_k = settings.RECOMMENDATIONS_TOP_K
+
+    def recommendations():
+        for row in range(size):
+            cols, values = _row(scores, row)
+            followed, _ = _row(follows, row)
+            keep = ~numpy.isin(cols, followed) & (cols != row)
+            cols, values = cols[keep], values[keep]
+            if not len(cols):
+                continue
+            if weight and totals[row]:
+                shared = membership[cols] @ profile[row].T
+                values = values + weight * shared.toarray().ravel()
+            if len(cols) > top_k:
+                best = numpy.argpartition(-values, top_k)[:top_k]
+                cols, values = cols[best], values[best]
+            order = numpy.argsort(-values)
+            yield int(ids[row]), list(zip(
+                ids[cols[order]].tolist(), values[order].tolist()
+            ))
+
+    return neighbors, recommendations()
+
+
+def _save(model, owner_field, other_field, rows, batch_size):
+    objects = (
+        model(**{
+            f'{owner_field}_id': owner_id,
+            f'{other_field}_id': other_id,
+            'score': score,
+        })
+        for owner_id, ranked in rows
+        for other_id, score in ranked
+    )
+    saved = 0
+    while True:
+        batch = list(islice(objects, batch_size))
+        if not batch:
+            return saved
+        model.objects.bulk_create(batch)
+        saved += len(batch)
+
+
+def build(batch_size=1000):
+    """Пересчитывает соседей авторов и рекомендации всех пользователей.
+
+    Возвращает число сохранённых соседей и рекомендаций.
+    """
+    edges = list(Follow.objects.values_list('user_id', 'author_id'))
+    groups = author_groups()
+    neighbors, recommendations = sparse_scores(edges, groups)
+    with transaction.atomic():
+        AuthorNeighbor.objects.all().delete()
+        neighbors_saved = _save(
+            AuthorNeighbor, 'author', 'neighbor', neighbors, batch_size
+        )
+        Recommendation.objects.all().delete()
+        recommendations_saved = _save(
+            Recommendation, 'user', 'author', recommendations, batch_size
+        )
+    # Меняются блоки во всех профилях: сдвигается общая версия.
+    caching.bump(caching.ALL_FEEDS)
+    return neighbors_saved, recommendations_saved
+
+
+def refresh_user(user_id):
+    """Пересчитывает рекомендации пользователя; выполняется в фоне."""
+    username = User.objects.filter(pk=user_id).values_list(
+        'username', flat=True
+    ).first()
+    if username is None:
+        return
+    followed = set(
+        Follow.objects.filter(user_id=user_id).values_list(
+            'author_id', flat=True
+        )
+    )
+    neighbors = defaultdict(list)
+    for author_id, neighbor_id, score in AuthorNeighbor.objects.filter(
+        author_id__in=followed
+    ).values_list('author_id', 'neighbor_id', 'score'):
+        neighbors[author_id].append((neighbor_id, score))
+    candidates = {
+        neighbor_id for pairs in neighbors.values()
+        for neighbor_id, _ in pairs
+    }
+    ranked = rank(
+        user_id, followed, neighbors, author_groups(followed | candidates)
+    )
+    with transaction.atomic():
+        Recommendation.objects.filter(user_id=user_id).delete()
+        Recommendation.objects.bulk_create(
+            Recommendation(user_id=user_id, author_id=author_id, score=score)
+            for author_id, score in ranked
+        )
+    caching.bump(f'author:{username}')
+
+
+def for_user(user, limit=None):
+    """Авторы для блока «Кого почитать».
+
+    Пока рекомендации не посчитаны (новый пользователь или ещё не было
+    build), показываются самые читаемые авторы.
+    """
+    if not user.is_authenticated:
+        return []
+    limit = limit or settings.RECOMMENDATIONS_SHOWN
+    authors = [
+        recommendation.author
+        for recommendation in Recommendation.objects.filter(
+            user=user
+        ).select_related('author').order_by('-score')[:limit]
+    ]
+    if authors:
+        return authors
+    popular = UserCounter.objects.exclude(
+        user_id__in=follow_set.author_ids(user) | {user.pk}
+    ).select_related('user').order_by('-followers_count')[:limit]
+    return [counter.user for counter in popular]
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from recommendations import engine
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рекомендации авторов по графу подписок; '
+        'запускается по расписанию, например раз в сутки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        neighbors, recommendations = engine.build(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Похожих авторов: {neighbors}, рекомендаций: '
+            f'{recommendations} ({time.monotonic() - start:.1f} с).'
+        ))
@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.db.models.constraints import UniqueConstraint
+
+
+User = get_user_model()
+
+
+class AuthorNeighbor(models.Model):
+    """Автор, которого часто читают вместе с author."""
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор'
+    )
+    neighbor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Похожий автор'
+    )
+    score = models.FloatField('Сходство')
+
+    class Meta:
+        verbose_name = 'Похожий автор'
+        verbose_name_plural = 'Похожие авторы'
+        constraints = [
+            UniqueConstraint(
+                fields=['author', 'neighbor'],
+                name='unique_author_neighbor'
+            )
+        ]
+
+
+class Recommendation(models.Model):
+    """Автор, на которого стоит подписаться user."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='recommendations',
+        verbose_name='Пользователь'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор'
+    )
+    score = models.FloatField('Оценка')
+
+    class Meta:
+        verbose_name = 'Рекомендация'
+        verbose_name_plural = 'Рекомендации'
+        constraints = [
+            UniqueConstraint(
+                fields=['user', 'author'],
+                name='unique_recommendation'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-score'],
+                name='recommendation_user_score'
+            ),
+        ]
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core import tasks
+from posts.models import Follow
+
+from . import engine
+from .models import Recommendation
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, **kwargs):
+    if created:
+        # Автор сразу пропадает из блока, остальное пересчитается в фоне.
+        Recommendation.objects.filter(
+            user_id=instance.user_id, author_id=instance.author_id
+        ).delete()
+        tasks.submit(engine.refresh_user, instance.user_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    tasks.submit(engine.refresh_user, instance.user_id)
@@ -0,0 +1,146 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import caching
+from posts.models import Follow, Group, Post, User
+from recommendations import engine
+from recommendations.models import AuthorNeighbor, Recommendation
+
+
+class RecommendationsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.first = User.objects.create_user(username='first')
+        cls.second = User.objects.create_user(username='second')
+        cls.other = User.objects.create_user(username='other')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.fans = [
+            User.objects.create_user(username=f'fan{number}')
+            for number in range(3)
+        ]
+        for author in (cls.first, cls.second):
+            Post.objects.create(author=author, group=cls.group, text='Пост')
+        # Все фанаты читают first и second, читатель - только first.
+        for fan in cls.fans:
+            Follow.objects.create(user=fan, author=cls.first)
+            Follow.objects.create(user=fan, author=cls.second)
+        Follow.objects.create(user=cls.fans[0], author=cls.other)
+        Follow.objects.create(user=cls.reader, author=cls.first)
+
+    def setUp(self):
+        cache.clear()
+        self.reader = User.objects.get(pk=self.reader.pk)
+
+    def recommended(self, user):
+        return list(
+            Recommendation.objects.filter(user=user).order_by(
+                '-score'
+            ).values_list('author__username', 'score')
+        )
+
+    def test_build(self):
+        """Автора читают вместе с подписками: сходство и общие группы."""
+        engine.build()
+        neighbor = AuthorNeighbor.objects.get(
+            author=self.first, neighbor=self.second
+        )
+        # Подписчиков 4 и 3, общих 3.
+        self.assertAlmostEqual(neighbor.score, 3 / 12 ** 0.5)
+        (author, score), *rest = self.recommended(self.reader)
+        self.assertEqual(author, 'second')
+        self.assertAlmostEqual(score, 3 / 12 ** 0.5 + 0.5)
+        self.assertEqual([author for author, _ in rest], ['other'])
+
+    def test_followed_authors_excluded(self):
+        """Подписки и сам пользователь в рекомендации не попадают."""
+        engine.build()
+        self.assertEqual(
+            [author for author, _ in self.recommended(self.fans[1])],
+            ['other']
+        )
+        self.assertEqual(self.recommended(self.fans[0]), [])
+
+    @mock.patch('recommendations.signals.tasks.submit')
+    def test_follow_refreshes_user(self, submit):
+        """Подписка убирает автора сразу и пересчитывает пользователя."""
+        engine.build()
+        Follow.objects.create(user=self.reader, author=self.second)
+        self.assertNotIn(
+            'second', dict(self.recommended(self.reader))
+        )
+        submit.assert_called_with(engine.refresh_user, self.reader.pk)
+        Follow.objects.filter(user=self.reader, author=self.second).delete()
+        submit.assert_called_with(engine.refresh_user, self.reader.pk)
+        engine.refresh_user(self.reader.pk)
+        self.assertEqual(self.recommended(self.reader)[0][0], 'second')
+
+    def test_profile_cache_invalidated(self):
+        """Пересчёт сдвигает версии профилей с блоком рекомендаций."""
+        scopes = (caching.ALL_FEEDS, 'author:reader')
+        before = caching.versions(*scopes)
+        engine.build()
+        built = caching.versions(*scopes)
+        self.assertNotEqual(built[0], before[0])
+        engine.refresh_user(self.reader.pk)
+        self.assertNotEqual(caching.versions(*scopes)[1], built[1])
+
+    def test_fallback_to_popular_authors(self):
+        """Без расчёта показываются самые читаемые авторы."""
+        self.assertEqual(
+            engine.for_user(self.reader, limit=2),
+            [self.second, self.other]
+        )
+        engine.build()
+        self.assertEqual(
+            engine.for_user(self.reader, limit=1), [self.second]
+        )
+
+    def test_follow_page_block(self):
+        """Блок «Кого почитать» на странице подписок."""
+        engine.build()
+        client = Client()
+        client.force_login(self.reader)
+        response = client.get(reverse('posts:follow_index'))
+        self.assertEqual(response.context['recommended'][0], self.second)
+        self.assertContains(response, 'Кого почитать')
+
+    def test_command(self):
+        """Команда build_recommendations заполняет таблицы."""
+        out = StringIO()
+        call_command('build_recommendations', stdout=out)
+        self.assertIn('рекомендаций', out.getvalue())
+        self.assertTrue(Recommendation.objects.exists())
+
+    def test_sparse_matches_python(self):
+        """Матричный расчёт совпадает с расчётом на словарях."""
+        edges = list(Follow.objects.values_list('user_id', 'author_id'))
+        groups = engine.author_groups()
+        results = [
+            scorer(edges, groups)
+            for scorer in (engine.python_scores, engine.sparse_scores)
+        ]
+        (neighbors, recommendations), (sparse_neighbors,
+                                       sparse_recommendations) = results
+        self.assertEqual(
+            self.rounded(neighbors), self.rounded(sparse_neighbors)
+        )
+        self.assertEqual(
+            self.rounded(recommendations),
+            self.rounded(sparse_recommendations),
+        )
+
+    @staticmethod
+    def rounded(rows):
+        return {
+            owner: {other: round(score, 9) for other, score in pairs}
+            for owner, pairs in rows if pairs
+        }
@@ -0,0 +1,12 @@
+from .index import backend
+
+
+class IndexedSearchMixin:
+    """Поиск в админке через полнотекстовый индекс вместо LIKE."""
+    search_kind = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        ids = backend().ids(self.search_kind, search_term)
+        return queryset.filter(pk__in=ids), False
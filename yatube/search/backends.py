@@ -0,0 +1,177 @@
+"""Бэкенды полнотекстового индекса постов и комментариев.
+
+Документ индекса - пост или комментарий. В индекс попадают основы
+слов (см. stemmer), поисковый запрос приводится к основам так же.
+Найденные документы группируются по посту, поэтому поиск находит
+пост и по его тексту, и по тексту комментариев к нему.
+"""
+from collections import Counter
+
+from django.db import connection
+from django.db.models import Count, Sum
+
+from .models import Posting
+from .stemmer import stems
+
+
+KINDS = ('post', 'comment')
+
+
+class BaseBackend:
+    """Интерфейс бэкенда поиска."""
+
+    def index(self, kind, object_id, post_id, text):
+        raise NotImplementedError
+
+    def remove(self, kind, object_id):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def count(self, query):
+        """Число постов, подходящих под запрос."""
+        raise NotImplementedError
+
+    def search(self, query, offset, limit):
+        """id постов по убыванию релевантности."""
+        raise NotImplementedError
+
+    def ids(self, kind, query):
+        """id документов одного типа, подходящих под запрос."""
+        raise NotImplementedError
+
+
+class SqliteFTSBackend(BaseBackend):
+    """Индекс на виртуальной таблице SQLite FTS5 с ранжированием bm25.
+
+    rowid документа вычисляется из типа и id, поэтому обновление и
+    удаление документа не требует сканирования индекса.
+    """
+    table = 'search_fts'
+
+    def _rowid(self, kind, object_id):
+        return object_id * len(KINDS) + KINDS.index(kind)
+
+    def _match(self, query):
+        return ' '.join(f'"{term}"' for term in dict.fromkeys(stems(query)))
+
+    def index(self, kind, object_id, post_id, text):
+        self.remove(kind, object_id)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, body, kind, post_id) '
+                'VALUES (%s, %s, %s, %s)',
+                [
+                    self._rowid(kind, object_id),
+                    ' '.join(stems(text)),
+                    kind,
+                    post_id,
+                ]
+            )
+
+    def remove(self, kind, object_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE rowid = %s',
+                [self._rowid(kind, object_id)]
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+
+    def _fetch(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+    def count(self, query):
+        match = self._match(query)
+        if not match:
+            return 0
+        return self._fetch(
+            f'SELECT COUNT(DISTINCT post_id) FROM {self.table} '
+            f'WHERE {self.table} MATCH %s',
+            [match]
+        )[0]
+
+    def search(self, query, offset, limit):
+        match = self._match(query)
+        if not match:
+            return []
+        return self._fetch(
+            'SELECT post_id FROM ('
+            f'SELECT post_id, rank FROM {self.table} '
+            f'WHERE {self.table} MATCH %s'
+            ') GROUP BY post_id ORDER BY MIN(rank), post_id DESC '
+            'LIMIT %s OFFSET %s',
+            [match, limit, offset]
+        )
+
+    def ids(self, kind, query):
+        match = self._match(query)
+        if not match:
+            return []
+        rowids = self._fetch(
+            f'SELECT rowid FROM {self.table} '
+            f'WHERE {self.table} MATCH %s AND kind = %s',
+            [match, kind]
+        )
+        return [rowid // len(KINDS) for rowid in rowids]
+
+
+class InvertedIndexBackend(BaseBackend):
+    """Переносимый обратный индекс в обычной таблице Posting.
+
+    Подходит для любой СУБД; релевантность - сумма частот основ.
+    """
+
+    def index(self, kind, object_id, post_id, text):
+        self.remove(kind, object_id)
+        Posting.objects.bulk_create(
+            [
+                Posting(
+                    term=term[:64],
+                    kind=kind,
+                    object_id=object_id,
+                    post_id=post_id,
+                    weight=min(weight, 32767),
+                )
+                for term, weight in Counter(stems(text)).items()
+            ],
+            batch_size=500,
+        )
+
+    def remove(self, kind, object_id):
+        Posting.objects.filter(kind=kind, object_id=object_id).delete()
+
+    def clear(self):
+        Posting.objects.all().delete()
+
+    def _matches(self, query, group_by='post_id', **filters):
+        terms = {term[:64] for term in stems(query)}
+        matches = Posting.objects.filter(term__in=terms, **filters).values(
+            group_by
+        ).annotate(
+            matched=Count('term', distinct=True),
+            score=Sum('weight'),
+        ).filter(matched=len(terms))
+        return matches, terms
+
+    def count(self, query):
+        matches, terms = self._matches(query)
+        return matches.count() if terms else 0
+
+    def search(self, query, offset, limit):
+        matches, terms = self._matches(query)
+        if not terms:
+            return []
+        ranked = matches.order_by('-score', '-post_id')
+        return [row['post_id'] for row in ranked[offset:offset + limit]]
+
+    def ids(self, kind, query):
+        matches, terms = self._matches(query, 'object_id', kind=kind)
+        if not terms:
+            return []
+        return [row['object_id'] for row in matches]
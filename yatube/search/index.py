@@ -0,0 +1,62 @@
+"""Обновление поискового индекса и выдача результатов."""
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from posts.models import Comment, Post
+
+
+def backend():
+    return import_string(settings.SEARCH_BACKEND)()
+
+
+def index_post(post):
+    backend().index('post', post.pk, post.pk, post.text)
+
+
+def remove_post(post):
+    backend().remove('post', post.pk)
+
+
+def index_comment(comment):
+    backend().index('comment', comment.pk, comment.post_id, comment.text)
+
+
+def remove_comment(comment):
+    backend().remove('comment', comment.pk)
+
+
+def rebuild():
+    """Строит индекс заново, возвращает число документов."""
+    search = backend()
+    search.clear()
+    total = 0
+    for post in Post.objects.only('pk', 'text').iterator():
+        search.index('post', post.pk, post.pk, post.text)
+        total += 1
+    comments = Comment.objects.only('pk', 'post_id', 'text')
+    for comment in comments.iterator():
+        search.index('comment', comment.pk, comment.post_id, comment.text)
+        total += 1
+    return total
+
+
+class SearchResults:
+    """Ленивая выдача поиска, которую понимает Paginator."""
+
+    def __init__(self, query):
+        self.query = query
+        self.backend = backend()
+
+    def count(self):
+        return self.backend.count(self.query)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        offset = key.start or 0
+        ids = self.backend.search(self.query, offset, key.stop - offset)
+        posts = Post.objects.select_related('author', 'group').in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
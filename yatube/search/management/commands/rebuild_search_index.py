@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from search import index
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс постов и комментариев.'
+
+    def handle(self, *args, **options):
+        total = index.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Проиндексировано: {total}'))
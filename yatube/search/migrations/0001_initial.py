@@ -0,0 +1,53 @@
+# Generated by Django 2.2.19 on 2026-10-18 17:16
+
+from django.db import migrations, models
+
+
+def create_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE search_fts USING fts5('
+        'body, kind UNINDEXED, post_id UNINDEXED, '
+        "tokenize = 'unicode61 remove_diacritics 0')"
+    )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS search_fts')
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Posting',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Основа слова')),
+                ('kind', models.CharField(max_length=16, verbose_name='Тип документа')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Документ')),
+                ('post_id', models.PositiveIntegerField(verbose_name='Пост')),
+                ('weight', models.PositiveSmallIntegerField(default=1, verbose_name='Частота')),
+            ],
+            options={
+                'verbose_name': 'Вхождение',
+                'verbose_name_plural': 'Вхождения',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='posting',
+            index=models.Index(fields=['term', 'post_id'], name='posting_term'),
+        ),
+        migrations.AddIndex(
+            model_name='posting',
+            index=models.Index(fields=['kind', 'object_id'], name='posting_document'),
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,21 @@
+from django.db import models
+
+
+class Posting(models.Model):
+    """Вхождение основы слова в документ (обратный индекс)."""
+    term = models.CharField('Основа слова', max_length=64)
+    kind = models.CharField('Тип документа', max_length=16)
+    object_id = models.PositiveIntegerField('Документ')
+    post_id = models.PositiveIntegerField('Пост')
+    weight = models.PositiveSmallIntegerField('Частота', default=1)
+
+    class Meta:
+        verbose_name = 'Вхождение'
+        verbose_name_plural = 'Вхождения'
+        indexes = [
+            models.Index(fields=['term', 'post_id'], name='posting_term'),
+            models.Index(
+                fields=['kind', 'object_id'],
+                name='posting_document'
+            ),
+        ]
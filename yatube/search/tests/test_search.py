@@ -0,0 +1,73 @@
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Post, User
+from search.stemmer import stem
+
+
+class StemmerTests(TestCase):
+    def test_stem(self):
+        """Разные формы слова приводятся к одной основе."""
+        words = {
+            'красивая': 'красив',
+            'книги': 'книг',
+            'работать': 'работа',
+            'важности': 'важност',
+            'Ёлками': 'елк',
+        }
+        for word, expected in words.items():
+            with self.subTest(word=word):
+                self.assertEqual(stem(word), expected)
+
+
+class SearchViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Avtoritto')
+        cls.cats = Post.objects.create(
+            author=cls.user,
+            text='Мои кошки любят спать на подоконнике',
+        )
+        cls.dogs = Post.objects.create(
+            author=cls.user,
+            text='Собака гуляет во дворе',
+        )
+        Comment.objects.create(
+            post=cls.dogs,
+            author=cls.user,
+            text='Какие пушистые кошки!',
+        )
+
+    def setUp(self):
+        self.client = Client()
+
+    def found(self, query):
+        response = self.client.get(reverse('search:search'), {'q': query})
+        return list(response.context['page_obj'])
+
+    def check_backend(self):
+        self.assertCountEqual(self.found('кошкам'), [self.cats, self.dogs])
+        self.assertEqual(self.found('собаки дворы'), [self.dogs])
+        self.assertEqual(self.found('хомяк'), [])
+        self.assertEqual(self.found(''), [])
+        Post.objects.get(pk=self.cats.pk).delete()
+        self.assertEqual(self.found('кошка'), [self.dogs])
+
+    def test_sqlite_fts_backend(self):
+        """Поиск через FTS5 учитывает формы слов и комментарии."""
+        self.check_backend()
+
+    def test_bad_page_number(self):
+        """Номер страницы, который int() не разберёт, ведёт на первую."""
+        response = self.client.get(
+            reverse('search:search'), {'q': 'кошки', 'page': '²'}
+        )
+        self.assertEqual(response.context['page_obj'].number, 1)
+
+    @override_settings(SEARCH_BACKEND='search.backends.InvertedIndexBackend')
+    def test_inverted_index_backend(self):
+        """Переносимый обратный индекс ищет так же."""
+        from search import index
+        index.rebuild()
+        self.check_backend()
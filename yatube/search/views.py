@@ -0,0 +1,20 @@
+from urllib.parse import urlencode
+
+from django.shortcuts import render
+
+from core.queries import query_budget
+from posts import utils
+
+from .index import SearchResults
+
+
+@query_budget(5)
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page_obj = utils.paginator(request, SearchResults(query), keyset=False)
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        'extra_query': urlencode({'q': query}) + '&',
+    }
+    return render(request, 'search/results.html', context)
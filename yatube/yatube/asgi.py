@@ -0,0 +1,17 @@
+"""Точка входа для ASGI-серверов, например:
+
+    uvicorn yatube.asgi:application --workers 4
+"""
+import os
+
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+
+from core.asgi import WsgiToAsgi
+
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+application = WsgiToAsgi(
+    get_wsgi_application(), threads=settings.ASGI_THREADS
+)
@@ -11,6 +11,16 @@ MEDIA_URL = '/media/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Загрузки больше этого размера пишутся во временный файл по частям,
+# а не держатся в памяти воркера.
+FILE_UPLOAD_MAX_MEMORY_SIZE = 512 * 1024
+
+IMAGE_UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+IMAGE_MAX_DIMENSION = 10000
+# Сторона и качество хранимой копии картинки поста.
+IMAGE_MASTER_SIZE = 1920
+IMAGE_QUALITY = 85
+
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 
@@ -33,10 +43,16 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'search.apps.SearchConfig',
+    'api.apps.ApiConfig',
+    'notifications.apps.NotificationsConfig',
+    'recommendations.apps.RecommendationsConfig',
     'sorl.thumbnail',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.QueryCountMiddleware',
+    'core.routers.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -69,6 +85,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
+# Потоков на процесс под ASGI-сервером; каждый открытый поток SSE
+# занимает один из них, поэтому их не больше EVENTS_MAX_STREAMS.
+ASGI_THREADS = 32
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
@@ -76,6 +96,12 @@ DATABASES = {
     }
 }
 
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+DATABASE_REPLICAS = []
+
+REPLICA_STICKY_SECONDS = 10
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME':
@@ -109,6 +135,21 @@ TIME_ZONE = 'UTC'
 
 PAGINATOR_COUNT_POSTS = 10
 
+PAGINATOR_KEYSET = False
+
+# Номеров страниц по обе стороны от текущей в паджинаторе.
+PAGINATOR_WINDOW = 3
+
+# С какого числа строк по плану PostgreSQL не считать их точно.
+PAGINATOR_ESTIMATE_ABOVE = 10000
+
+TIMELINE_LENGTH = 1000
+
+TIMELINE_FANOUT_LIMIT = 10000
+# На сколько секунд назад от отметки перечитываются посты популярных
+# авторов: пост получает pub_date до коммита и может стать виден позже.
+TIMELINE_PULL_OVERLAP = 60
+
 STATIC_URL = '/static/'
 
 STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
@@ -117,8 +158,65 @@ LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
+EMAIL_QUEUE_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+EMAIL_QUEUE_BATCH_SIZE = 100
+EMAIL_QUEUE_MAX_ATTEMPTS = 5
+EMAIL_QUEUE_RETRY_DELAY = 60
+EMAIL_QUEUE_LEASE = 5 * 60
+
+FEED_CACHE_TIMEOUT = 60 * 60
+
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+COMMENTS_PER_PAGE = 20
+
+COMMENTS_CACHE_TIMEOUT = 60 * 60 * 24
+
+FOLLOW_SET_CACHE_TIMEOUT = 60 * 60 * 24
+
+FOLLOW_LIST_PAGE_SIZE = 50
+# До скольких подписок проверять связи списком id, дальше - подзапросом.
+FOLLOW_GRAPH_IN_LIMIT = 1000
+
+# Похожих авторов на автора и рекомендаций на пользователя в таблицах.
+RECOMMENDATIONS_NEIGHBORS = 50
+RECOMMENDATIONS_TOP_K = 20
+# Вес общих групп против сходства по подписчикам.
+RECOMMENDATIONS_GROUP_WEIGHT = 0.5
+RECOMMENDATIONS_SHOWN = 5
+
+# Вес события в оценке популярности убывает вдвое за TRENDING_HALF_LIFE
+# секунд; decay_trending запускается раз в TRENDING_DECAY_INTERVAL,
+# но множитель считает по времени с прошлого затухания.
+TRENDING_HALF_LIFE = 6 * 60 * 60
+TRENDING_DECAY_INTERVAL = 10 * 60
+TRENDING_POST_WEIGHT = 1.0
+TRENDING_COMMENT_WEIGHT = 1.0
+# Строки с меньшей оценкой удаляются при затухании.
+TRENDING_MIN_SCORE = 0.1
+TRENDING_GROUPS_SHOWN = 5
+
+SEARCH_BACKEND = 'search.backends.SqliteFTSBackend'
+
+QUERY_REPEAT_THRESHOLD = 3
+
+TASKS_WORKERS = 0 if DEBUG else 2
+
+NOTIFICATIONS_BATCH_SIZE = 1000
+
+EVENTS_BROKER = 'core.events.InProcessBroker'
+EVENTS_DIR = os.path.join(BASE_DIR, 'events')
+EVENTS_FILE_MAX_BYTES = 1024 * 1024
+EVENTS_HEARTBEAT = 15
+EVENTS_STREAM_SECONDS = 5 * 60
+EVENTS_RETRY_MS = 3000
+# Открытых потоков SSE на процесс; остальные клиенты опрашивают канал
+# раз в EVENTS_POLL_MS. Под WSGI-сервером держите меньше числа потоков
+# воркера, 0 - только опрос.
+EVENTS_MAX_STREAMS = ASGI_THREADS // 2
+EVENTS_POLL_MS = 30 * 1000
 
 CACHES = {
     'default': {
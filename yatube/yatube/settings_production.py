@@ -0,0 +1,124 @@
+"""Настройки боевого окружения: PostgreSQL с репликами чтения.
+
+Параметры берутся из переменных окружения. Для локальной проверки
+маршрутизации достаточно двух файлов SQLite:
+
+    DB_ENGINE=django.db.backends.sqlite3 DB_NAME=db.sqlite3 \\
+    DB_REPLICAS=replica.sqlite3 \\
+    DJANGO_SETTINGS_MODULE=yatube.settings_production \\
+    python manage.py runserver
+
+Кеш обязан быть общим для всех процессов: в нём лежат версии лент,
+по которым сбрасываются страницы и ETag, и множества подписок, а
+сбрасывают их и веб-воркеры, и процессы фоновых задач. По умолчанию
+это файловый кеш в CACHE_DIR, он годится для одного сервера; для
+нескольких задайте CACHE_LOCATION=host:port (memcached, нужен пакет
+python-memcached).
+
+Файл реплики обновляется командой sync_replica. Письма из очереди
+отправляет send_queued_mail; локально их можно принять заглушкой
+SMTP, например python -m aiosmtpd -n -l localhost:1025 и EMAIL_PORT=1025.
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+
+SECRET_KEY = os.environ.get('SECRET_KEY', SECRET_KEY)  # noqa: F405
+
+DEBUG = os.environ.get('DEBUG', '') == '1'
+
+ALLOWED_HOSTS = os.environ.get(
+    'ALLOWED_HOSTS', ','.join(ALLOWED_HOSTS)  # noqa: F405
+).split(',')
+
+ASGI_THREADS = int(
+    os.environ.get('ASGI_THREADS', ASGI_THREADS)  # noqa: F405
+)
+
+EVENTS_MAX_STREAMS = int(
+    os.environ.get('EVENTS_MAX_STREAMS', ASGI_THREADS // 2)
+)
+
+TASKS_WORKERS = int(os.environ.get('TASKS_WORKERS', 2))
+
+CACHE_LOCATION = os.environ.get('CACHE_LOCATION', '')
+if CACHE_LOCATION:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': CACHE_LOCATION.split(','),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get(
+                'CACHE_DIR', os.path.join(BASE_DIR, 'cache')
+            ),
+            'OPTIONS': {'MAX_ENTRIES': 100000},
+        }
+    }
+
+# Несколько процессов-воркеров: события передаются через файлы.
+EVENTS_BROKER = 'core.events.FileBroker'
+
+EMAIL_QUEUE_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', '') == '1'
+EMAIL_TIMEOUT = 30
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'django.db.backends.postgresql')
+
+# Таблица FTS5 создаётся только в SQLite, на других базах индекс
+# хранится в обычной таблице search_posting.
+SEARCH_BACKEND = os.environ.get(
+    'SEARCH_BACKEND',
+    'search.backends.SqliteFTSBackend'
+    if DB_ENGINE == 'django.db.backends.sqlite3'
+    else 'search.backends.InvertedIndexBackend'
+)
+
+
+def database(name, host=None):
+    if DB_ENGINE == 'django.db.backends.sqlite3':
+        return {
+            'ENGINE': DB_ENGINE,
+            'NAME': os.path.join(BASE_DIR, name),
+        }
+    return {
+        'ENGINE': DB_ENGINE,
+        'NAME': name,
+        'USER': os.environ.get('DB_USER', 'yatube'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+        'HOST': host or os.environ.get('DB_HOST', 'localhost'),
+        'PORT': os.environ.get('DB_PORT', '5432'),
+        # Постоянные соединения: воркер не открывает новое на запрос.
+        # При пуле pgbouncer в режиме transaction ставьте 0.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+    }
+
+
+DB_NAME = os.environ.get('DB_NAME', 'yatube')
+
+# Для PostgreSQL - хосты реплик, для SQLite - файлы реплик.
+DB_REPLICAS = [
+    replica for replica in os.environ.get('DB_REPLICAS', '').split(',')
+    if replica
+]
+
+DATABASES = {'default': database(DB_NAME)}
+for number, replica in enumerate(DB_REPLICAS, start=1):
+    if DB_ENGINE == 'django.db.backends.sqlite3':
+        DATABASES[f'replica{number}'] = database(replica)
+    else:
+        DATABASES[f'replica{number}'] = database(DB_NAME, host=replica)
+    # В тестах реплика - та же база, что и основная.
+    DATABASES[f'replica{number}']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
@@ -24,6 +24,18 @@ urlpatterns = [
         '',
         include('posts.urls', namespace='posts')
     ),
+    path(
+        'search/',
+        include('search.urls', namespace='search')
+    ),
+    path(
+        'api/v1/',
+        include('api.urls', namespace='api')
+    ),
+    path(
+        'notifications/',
+        include('notifications.urls', namespace='notifications')
+    ),
     path(
         'about/',
         include('about.urls', namespace='about')